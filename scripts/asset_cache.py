@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# Process-wide cache of page assets shared by every browser context.
+#
+# Contexts are thrown away after each page, and Chromium's HTTP cache goes
+# with them, so p5.js, p5.quadrille.js, theme CSS, fonts and sketch images
+# used to be downloaded once per page. AssetCache intercepts those requests
+# (as a BrowserPool hook), fetches each URL once per run and answers later
+# requests from memory. Entries are evicted least-recently-used past a cap.
+
+import asyncio
+from collections import OrderedDict
+
+# ===== CONFIG =====
+ASSET_CACHE_MAX_BYTES = 256 * 1024**2
+ASSET_TYPES = {"script", "stylesheet", "image", "font", "media", "fetch", "xhr"}
+ASSET_TIMEOUT_MS = 10000
+# ===================
+
+# Hop-by-hop or length headers that must not be replayed on a cached body
+DROP_HEADERS = {"content-length", "content-encoding", "transfer-encoding", "connection"}
+
+
+class AssetCache:
+    def __init__(self, max_bytes=ASSET_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # url -> (status, headers, body)
+        self._inflight = {}  # url -> future, so concurrent pages fetch once
+
+    def _get(self, url: str):
+        entry = self._entries.get(url)
+        if entry is not None:
+            self._entries.move_to_end(url)
+        return entry
+
+    def _put(self, url: str, status: int, headers: dict, body: bytes):
+        if status != 200 or len(body) > self.max_bytes:
+            return
+        old = self._entries.pop(url, None)
+        if old is not None:
+            self.size -= len(old[2])
+        self._entries[url] = (status, headers, body)
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            _, (_, _, evicted) = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    async def _fetch(self, url: str, fetch):
+        # fetch() -> (status, headers, body); shared by concurrent requests
+        if url not in self._inflight:
+            async def run():
+                try:
+                    status, headers, body = await fetch()
+                    headers = {k: v for k, v in headers.items() if k.lower() not in DROP_HEADERS}
+                    self._put(url, status, headers, body)
+                    return status, headers, body
+                finally:
+                    del self._inflight[url]
+            self._inflight[url] = asyncio.ensure_future(run())
+        return await asyncio.shield(self._inflight[url])
+
+    async def _handle(self, route):
+        request = route.request
+        if request.method != "GET" or request.resource_type not in ASSET_TYPES:
+            await route.fallback()
+            return
+        url = request.url
+        entry = self._get(url)
+        if entry is None:
+            self.misses += 1
+
+            async def fetch():
+                response = await route.fetch(timeout=ASSET_TIMEOUT_MS)
+                return response.status, response.headers, await response.body()
+            try:
+                entry = await self._fetch(url, fetch)
+            except Exception:
+                await route.fallback()
+                return
+        else:
+            self.hits += 1
+        status, headers, body = entry
+        await route.fulfill(status=status, headers=headers, body=body)
+
+    def clear(self):
+        # Forget every stored body (in-flight fetches still complete)
+        self._entries.clear()
+        self.size = 0
+
+    async def install(self, ctx):
+        # BrowserPool hook; register before more specific routes (e.g. --site)
+        # so those run first for their own URLs
+        await ctx.route("**/*", self._handle)
+
+    async def prefetch(self, ctx, urls):
+        # Warm the cache ahead of the pages that need it
+        async def one(url):
+            if self._get(url) is not None:
+                return
+            async def fetch():
+                response = await ctx.request.get(url, timeout=ASSET_TIMEOUT_MS)
+                return response.status, response.headers, await response.body()
+            try:
+                await self._fetch(url, fetch)
+            except Exception:
+                pass
+        await asyncio.gather(*(one(u) for u in urls))
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# Benchmarks of Quadrille core operations in headless Chromium.
+#
+# Loads p5 and the built library (dist/p5.quadrille.js, `npm run build`)
+# into a blank page served from memory, then times each operation on square
+# grids from 8x8 to 2048x2048: WARMUP untimed runs, then REPS samples. Fast
+# operations are batched so every sample lasts at least MIN_SAMPLE_MS (the
+# browser's clock is coarse); inputs are cloned before the clock starts, so
+# destructive operations (fill, clear, rand, not) only time the operation.
+# An operation whose single run passes OP_BUDGET_MS is not tried on larger
+# grids. Results (p50/p95 per operation and size) are written as JSON;
+# --compare OLD.json prints the p50 ratio against an earlier run, e.g. one
+# made with --lib pointing at another release.
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import re
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from playwright.async_api import async_playwright
+
+# ===== CONFIG =====
+ROOT = Path(__file__).resolve().parent.parent
+LIB = ROOT / "dist" / "p5.quadrille.js"
+P5_LOCAL = ROOT / "node_modules" / "p5" / "lib" / "p5.min.js"
+P5_CDN = "https://cdn.jsdelivr.net/npm/p5@{}/lib/p5.min.js"  # when not installed
+SIZES = [8, 16, 32, 64, 128, 256, 512, 1024, 2048]
+OPS = ["visit", "fill", "clear", "rand", "not", "or", "and", "xor", "diff",
+       "toBigInt", "bitboard"]
+WARMUP = 3
+REPS = 15
+MIN_SAMPLE_MS = 5
+OP_BUDGET_MS = 5000
+SEED = 42
+OUT = "bench-quadrille.json"
+ORIGIN = "http://bench.local"
+# ===================
+
+PAGE_HTML = """<!doctype html>
+<html><head><meta charset="utf-8">
+<script src="{p5}"></script>
+<script src="{lib}"></script>
+</head><body></body></html>
+"""
+
+# window.__bench(op, size, opts) -> {samples: [ms per run], batch, ...}
+BENCH_JS = """
+(() => {
+  const ready = new Promise(resolve => new p5(p => {
+    p.setup = () => { p.noCanvas(); resolve(p) }
+  }))
+  const now = () => performance.now()
+  const collect = () => { if (window.gc) window.gc() }
+  const VALUE = 1
+
+  // A random hex bitboard with about half of its n bits set
+  const bits = (n, rnd) => {
+    const digits = Math.ceil(n / 4)
+    // Top bit set, so a bitboard-built grid keeps every row
+    let hex = (8 + Math.floor(rnd() * 8)).toString(16)
+    for (let i = 1; i < digits; i++) hex += Math.floor(rnd() * 16).toString(16)
+    return BigInt('0x' + hex) >> BigInt(digits * 4 - n)
+  }
+
+  // op -> (p, fixtures) => { input(): per-run input, run(input) }
+  const OPS = {
+    visit: (p, f) => ({ input: () => f.a, run: q => { let n = 0; q.visit(() => n++) } }),
+    fill: (p, f) => ({ input: () => f.empty.clone(), run: q => q.fill(VALUE) }),
+    clear: (p, f) => ({ input: () => f.a.clone(), run: q => q.clear() }),
+    rand: (p, f) => ({ input: () => f.empty.clone(), run: q => q.rand(f.cells >> 1, VALUE) }),
+    not: (p, f) => ({ input: () => f.a.clone(), run: q => q.not(VALUE) }),
+    or: (p, f) => ({ input: () => f.a, run: q => Quadrille.or(q, f.b) }),
+    and: (p, f) => ({ input: () => f.a, run: q => Quadrille.and(q, f.b) }),
+    xor: (p, f) => ({ input: () => f.a, run: q => Quadrille.xor(q, f.b) }),
+    diff: (p, f) => ({ input: () => f.a, run: q => Quadrille.diff(q, f.b) }),
+    toBigInt: (p, f) => ({ input: () => f.a, run: q => q.toBigInt() }),
+    bitboard: (p, f) => ({
+      input: () => f.board,
+      run: b => p.createQuadrille(f.size, f.size, b, VALUE),
+    }),
+  }
+
+  const fixtures = new Map()
+  const fixture = (p, size, seed) => {
+    if (!fixtures.has(size)) {
+      fixtures.clear()  // one size at a time: 2048x2048 grids are big
+      p.randomSeed(seed)
+      const rnd = () => p.random()
+      const board = bits(size * size, rnd)
+      fixtures.set(size, {
+        size,
+        cells: size * size,
+        board,
+        empty: p.createQuadrille(size, size),
+        a: p.createQuadrille(size, size, board, VALUE),
+        b: p.createQuadrille(size, size, bits(size * size, rnd), VALUE),
+      })
+    }
+    return fixtures.get(size)
+  }
+
+  window.__benchInfo = async () => {
+    await ready
+    return { quadrille: Quadrille.VERSION, p5: p5.VERSION, gc: !!window.gc }
+  }
+
+  window.__bench = async (op, size, { warmup, reps, minSampleMs, budgetMs, seed }) => {
+    const p = await ready
+    const f = fixture(p, size, seed)
+    const { input, run } = OPS[op](p, f)
+    // One timed run first: too slow means no warmup, no samples
+    let x = input()
+    collect()
+    let t = now()
+    run(x)
+    const first = now() - t
+    if (first > budgetMs) return { first, over: true, samples: [] }
+    for (let i = 0; i < warmup; i++) run(input())
+    // Calibrate the batch on a warm run
+    x = input()
+    t = now()
+    run(x)
+    const warm = now() - t
+    const batch = Math.max(1, Math.ceil(minSampleMs / Math.max(warm, 0.001)))
+    const samples = []
+    for (let r = 0; r < reps; r++) {
+      const inputs = Array.from({ length: batch }, input)
+      collect()
+      t = now()
+      for (let i = 0; i < batch; i++) run(inputs[i])
+      samples.push((now() - t) / batch)
+    }
+    return { first, over: false, batch, samples }
+  }
+})()
+"""
+
+
+def percentile(samples, q: float) -> float:
+    # Nearest-rank percentile
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def summarize(op: str, size: int, result: dict) -> dict:
+    samples = result["samples"]
+    return {
+        "op": op,
+        "size": size,
+        "cells": size * size,
+        "batch": result["batch"],
+        "reps": len(samples),
+        "p50_ms": round(percentile(samples, 50), 6),
+        "p95_ms": round(percentile(samples, 95), 6),
+        "min_ms": round(min(samples), 6),
+        "mean_ms": round(sum(samples) / len(samples), 6),
+    }
+
+
+def p5_source(spec) -> str:
+    # A local p5 if node_modules has one, else the CDN build package.json asks for
+    if spec:
+        return spec
+    if P5_LOCAL.exists():
+        return str(P5_LOCAL)
+    package = json.loads((ROOT / "package.json").read_text(encoding="utf-8"))
+    wanted = package.get("devDependencies", {}).get("p5", "2")
+    return P5_CDN.format(re.sub(r"^[^\d]*", "", wanted))
+
+
+def is_url(spec: str) -> bool:
+    return spec.startswith(("http://", "https://"))
+
+
+def describe(spec: str) -> dict:
+    if is_url(spec):
+        return {"url": spec}
+    data = Path(spec).read_bytes()
+    return {"file": str(spec), "sha256": hashlib.sha256(data).hexdigest()}
+
+
+async def run(lib, p5, ops, sizes, warmup, reps, budget_ms) -> dict:
+    if not is_url(lib) and not Path(lib).exists():
+        raise SystemExit(f"❌ No existe {lib}; ejecuta `npm run build` o usa --lib")
+    scripts = {"/p5.js": p5, "/quadrille.js": lib}
+    html = PAGE_HTML.format(
+        p5=p5 if is_url(p5) else f"{ORIGIN}/p5.js",
+        lib=lib if is_url(lib) else f"{ORIGIN}/quadrille.js",
+    )
+
+    async def serve(route):
+        path = route.request.url[len(ORIGIN):].split("?")[0]
+        if path in scripts:
+            await route.fulfill(path=scripts[path], content_type="text/javascript")
+        else:
+            await route.fulfill(body=html, content_type="text/html")
+
+    results, skipped = [], []
+    async with async_playwright() as play:
+        browser = await play.chromium.launch(headless=True, args=["--js-flags=--expose-gc"])
+        try:
+            page = await browser.new_page()
+            await page.route(f"{ORIGIN}/**", serve)
+            await page.goto(f"{ORIGIN}/")
+            await page.add_script_tag(content=BENCH_JS)  # once p5 and the library loaded
+            info = await page.evaluate("window.__benchInfo()")
+            print(f"🧪 Quadrille {info['quadrille']} · p5 {info['p5']} · {browser.version}")
+            opts = {"warmup": warmup, "reps": reps, "minSampleMs": MIN_SAMPLE_MS,
+                    "budgetMs": budget_ms, "seed": SEED}
+            too_slow = set()
+            for size in sizes:
+                for op in ops:
+                    if op in too_slow:
+                        skipped.append({"op": op, "size": size})
+                        continue
+                    result = await page.evaluate(
+                        "([op, size, opts]) => window.__bench(op, size, opts)", [op, size, opts]
+                    )
+                    if result["over"]:
+                        print(f"   {op:>9} {size:>5}²  {result['first']:.0f} ms > {budget_ms} ms; "
+                              f"se omiten tamaños mayores")
+                        too_slow.add(op)
+                        skipped.append({"op": op, "size": size, "first_ms": round(result["first"], 3)})
+                        continue
+                    row = summarize(op, size, result)
+                    results.append(row)
+                    print(f"   {op:>9} {size:>5}²  p50 {row['p50_ms']:.4f} ms  p95 {row['p95_ms']:.4f} ms")
+        finally:
+            await browser.close()
+
+    return {
+        "generated": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "quadrille": {"version": info["quadrille"], **describe(lib)},
+        "p5": {"version": info["p5"], **describe(p5)},
+        "browser": browser.version,
+        "gc_between_samples": info["gc"],
+        "config": {"warmup": warmup, "reps": reps, "min_sample_ms": MIN_SAMPLE_MS,
+                   "op_budget_ms": budget_ms, "seed": SEED},
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def compare(report: dict, baseline_path):
+    # p50 of this run over the baseline's, per op and size
+    baseline = json.loads(Path(baseline_path).read_text(encoding="utf-8"))
+    before = {(r["op"], r["size"]): r for r in baseline["results"]}
+    print(f"📈 {report['quadrille']['version']} frente a {baseline['quadrille']['version']} (p50)")
+    for row in report["results"]:
+        old = before.get((row["op"], row["size"]))
+        if old and old["p50_ms"] > 0:
+            ratio = row["p50_ms"] / old["p50_ms"]
+            flag = "🐢" if ratio > 1.1 else "🚀" if ratio < 0.9 else "  "
+            print(f"   {flag} {row['op']:>9} {row['size']:>5}²  ×{ratio:.2f}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark Quadrille core operations")
+    parser.add_argument("--lib", default=str(LIB), metavar="FILE|URL",
+                        help=f"library build to load (default: {LIB.relative_to(ROOT)})")
+    parser.add_argument("--p5", metavar="FILE|URL",
+                        help="p5 build to load (default: node_modules, else the CDN)")
+    parser.add_argument("--ops", nargs="+", choices=OPS, default=OPS, metavar="OP",
+                        help="operations to time (default: all)")
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES, metavar="N",
+                        help="grid sides to try (default: 8 … 2048)")
+    parser.add_argument("--warmup", type=int, default=WARMUP,
+                        help=f"untimed runs per operation and size (default: {WARMUP})")
+    parser.add_argument("--reps", type=int, default=REPS,
+                        help=f"timed samples per operation and size (default: {REPS})")
+    parser.add_argument("--budget", type=int, default=OP_BUDGET_MS, metavar="MS",
+                        help=f"skip larger grids once one run takes longer (default: {OP_BUDGET_MS})")
+    parser.add_argument("--out", default=OUT, help=f"JSON results file (default: {OUT})")
+    parser.add_argument("--compare", metavar="OLD.json",
+                        help="print p50 ratios against an earlier results file")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    start = time.perf_counter()
+    report = asyncio.run(run(args.lib, p5_source(args.p5), args.ops, sorted(args.sizes),
+                             args.warmup, max(1, args.reps), args.budget))
+    Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"✅ {args.out} ({time.perf_counter() - start:.1f}s)")
+    if args.compare:
+        compare(report, args.compare)
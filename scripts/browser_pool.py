@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# Long-lived Chromium pool shared by the build_*_pdf.py scripts.
+#
+# Launching Chromium with the swiftshader flags costs seconds, so a run keeps
+# a few browsers alive and hands out fresh contexts (or pages) instead of a
+# new browser per page. A browser is retired after PAGES_PER_BROWSER contexts
+# and relaunched on demand, which keeps memory bounded on long sections.
+#
+# A watchdog task pings every browser each WATCH_INTERVAL_S through a browser
+# CDP session (SystemInfo.getProcessInfo, which also lists its processes).
+# A browser that doesn't answer within PING_TIMEOUT_S, or whose context
+# doesn't close within CLOSE_TIMEOUT_S, is killed: its pages fail and the
+# section runner requeues them on a fresh browser. One whose processes
+# together pass MAX_RSS_MB is retired early and closes once idle.
+
+import asyncio
+import os
+import signal
+from contextlib import asynccontextmanager
+
+from build_report import phase
+from page_forensics import context_options
+
+# ===== CONFIG =====
+POOL_SIZE = 1
+PAGES_PER_BROWSER = 25
+WATCH_INTERVAL_S = 5
+PING_TIMEOUT_S = 10
+CLOSE_TIMEOUT_S = 10
+MAX_RSS_MB = 1536  # browser + renderers + GPU process; 0 = no limit
+# ===================
+
+
+def process_rss(pid: int) -> int:
+    # Resident set of one process in bytes (0 where /proc isn't available)
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+class _Slot:
+    def __init__(self, browser):
+        self.browser = browser
+        self.uses = 0
+        self.active = 0
+        self.retired = False
+        self.dead = False
+        self.pids = []  # from the last ping
+        self.rss = 0
+        self._cdp = None
+
+    async def ping(self):
+        # Raises if the browser doesn't answer; refreshes pids and rss
+        if self._cdp is None:
+            self._cdp = await self.browser.new_browser_cdp_session()
+        info = await self._cdp.send("SystemInfo.getProcessInfo")
+        self.pids = [p["id"] for p in info.get("processInfo", []) if p.get("id")]
+        self.rss = sum(process_rss(pid) for pid in self.pids)
+
+
+class BrowserPool:
+    def __init__(self, play, args=None, size=POOL_SIZE,
+                 pages_per_browser=PAGES_PER_BROWSER, headless=True, hooks=(),
+                 on_close=()):
+        self.play = play
+        self.args = list(args or [])
+        self.size = max(1, size)
+        self.pages_per_browser = max(1, pages_per_browser)
+        self.headless = headless
+        self.hooks = list(hooks)  # async hook(ctx) run on every new context; it
+                                  # may return an async teardown for before close
+        self.on_close = list(on_close)  # callables run once the browsers are gone
+        self.launches = 0
+        self.kills = 0  # browsers killed for not responding
+        self.recycled = 0  # browsers retired early for their memory use
+        self._slots = []
+        self._lock = asyncio.Lock()
+        self._watchdog = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def _launch(self):
+        with phase("launch"):  # charged to the page that needed the browser
+            browser = await self.play.chromium.launch(headless=self.headless, args=self.args)
+        self.launches += 1
+        if self._watchdog is None:
+            self._watchdog = asyncio.ensure_future(self._watch())
+        return _Slot(browser)
+
+    async def _acquire(self):
+        async with self._lock:
+            live = [s for s in self._slots if not s.retired]
+            if len(live) < self.size:
+                slot = await self._launch()
+                self._slots.append(slot)
+            else:
+                slot = min(live, key=lambda s: s.active)
+            slot.uses += 1
+            slot.active += 1
+            if slot.uses >= self.pages_per_browser:
+                slot.retired = True
+            return slot
+
+    async def _release(self, slot):
+        async with self._lock:
+            slot.active -= 1
+            if not (slot.retired and slot.active == 0) or slot not in self._slots:
+                return  # still in use, or already killed
+            self._slots.remove(slot)
+        await self._close_browser(slot)
+
+    async def _close_browser(self, slot):
+        try:
+            await asyncio.wait_for(slot.browser.close(), CLOSE_TIMEOUT_S)
+        except Exception:
+            await self._kill(slot, "no se cierra")
+
+    async def _kill(self, slot, reason: str):
+        # Take a browser out of service for good, by force
+        async with self._lock:
+            if slot.dead:
+                return
+            slot.dead = slot.retired = True
+            if slot in self._slots:
+                self._slots.remove(slot)
+        self.kills += 1
+        print(f"💀 Navegador {reason}; se reinicia")
+        for pid in slot.pids:
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except OSError:
+                pass
+        try:
+            await asyncio.wait_for(slot.browser.close(), CLOSE_TIMEOUT_S)
+        except Exception:
+            pass
+
+    async def _check(self, slot):
+        try:
+            await asyncio.wait_for(slot.ping(), PING_TIMEOUT_S)
+        except Exception:
+            await self._kill(slot, "sin respuesta")
+            return
+        if MAX_RSS_MB and slot.rss > MAX_RSS_MB * 2**20 and not slot.retired:
+            slot.retired = True
+            self.recycled += 1
+            print(f"♻️  Navegador en {slot.rss / 2**20:.0f} MB; se recicla")
+            if slot.active == 0:
+                await self._release_idle(slot)
+
+    async def _release_idle(self, slot):
+        async with self._lock:
+            if slot.active or slot not in self._slots:
+                return
+            self._slots.remove(slot)
+        await self._close_browser(slot)
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(WATCH_INTERVAL_S)
+            await asyncio.gather(*(self._check(s) for s in list(self._slots) if not s.dead))
+
+    @asynccontextmanager
+    async def context(self, **kwargs):
+        # Fresh, isolated context on a pooled browser
+        slot = await self._acquire()
+        try:
+            ctx = await slot.browser.new_context(**{**context_options(), **kwargs})
+            teardown = []  # what hooks returned, run before the context closes
+            try:
+                for hook in self.hooks:
+                    done = await hook(ctx)
+                    if done is not None:
+                        teardown.append(done)
+                yield ctx
+            finally:
+                for done in reversed(teardown):
+                    try:
+                        await done()
+                    except Exception as e:
+                        print(f"⚠️  Error al cerrar el contexto: {e}")
+                # A renderer stuck in script can keep this from returning
+                try:
+                    await asyncio.wait_for(ctx.close(), CLOSE_TIMEOUT_S)
+                except Exception:
+                    await self._kill(slot, "no cierra un contexto")
+        finally:
+            await self._release(slot)
+
+    @asynccontextmanager
+    async def page(self, **kwargs):
+        async with self.context(**kwargs) as ctx:
+            yield await ctx.new_page()
+
+    async def close(self):
+        if self._watchdog is not None:
+            self._watchdog.cancel()
+            await asyncio.gather(self._watchdog, return_exceptions=True)
+            self._watchdog = None
+        async with self._lock:
+            slots, self._slots = self._slots, []
+        for slot in slots:
+            try:
+                await slot.browser.close()
+            except Exception:
+                pass
+        for close in self.on_close:
+            close()
@@ -1,25 +1,146 @@
 #!/usr/bin/env python3
-import subprocess
-
-# List of scripts to run (in your desired order)
-scripts = [
-    "build_api_index_pdf.py",
-    "build_accessors_pdf.py",
-    "build_iterators_pdf.py",
-    "build_properties_pdf.py",
-    "build_reformatter_pdf.py",
-    "build_mutators_pdf.py",
-    "build_algebra_pdf.py",
-    "build_transforms_pdf.py",
-    "build_p5_functions_pdf.py",
-    "build_visual_algorithms_pdf.py",
-]
-
-for script in scripts:
-    print(f"\n=== Ejecutando {script} ===")
-    result = subprocess.run(["python3", script])
-    if result.returncode != 0:
-        print(f"❌ Error en {script}. Deteniendo ejecución.")
-        break
+# Builds every section PDF in one process: one Playwright driver, one browser
+# pool and one global page scheduler shared by all sections.
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from playwright.async_api import async_playwright
+
+import build_accessors_pdf
+import build_algebra_pdf
+import build_api_index_pdf
+import build_iterators_pdf
+import build_mutators_pdf
+import build_p5_functions_pdf
+import build_properties_pdf
+import build_reformatter_pdf
+import build_transforms_pdf
+import build_visual_algorithms_pdf
+from browser_pool import BrowserPool
+from build_journal import JOURNAL_DIR, Journal, add_resume_argument
+from build_report import add_report_argument, write_report
+from canvas_snapshot import SNAPSHOT, add_snapshot_argument
+from page_forensics import PAGE_BUDGET_S, add_forensics_arguments
+from section_runner import (
+    JOBS, LAUNCH_ARGS, add_cache_argument, asset_cache, pool_options, pool_size, section_pages,
+)
+from shards import (
+    add_shard_arguments, combined_manifest, shard_dir, shard_pages, write_shard_index,
+)
+from static_site import add_site_argument
+from virtual_time import add_virtual_time_argument
+
+# Sections (in your desired order)
+SECTIONS = {
+    "api_index": build_api_index_pdf,
+    "accessors": build_accessors_pdf,
+    "iterators": build_iterators_pdf,
+    "properties": build_properties_pdf,
+    "reformatter": build_reformatter_pdf,
+    "mutators": build_mutators_pdf,
+    "algebra": build_algebra_pdf,
+    "transforms": build_transforms_pdf,
+    "p5_functions": build_p5_functions_pdf,
+    "visual_algorithms": build_visual_algorithms_pdf,
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build all section PDFs")
+    parser.add_argument("--sections", nargs="+", choices=list(SECTIONS), default=list(SECTIONS),
+                        metavar="SECTION", help="sections to build (default: all)")
+    parser.add_argument("--jobs", "-j", type=int, default=JOBS,
+                        help=f"pages rendered at once across all sections (default: {JOBS})")
+    parser.add_argument("--keep-going", "-k", action="store_true",
+                        help="skip failed pages instead of stopping the build")
+    add_cache_argument(parser)
+    add_virtual_time_argument(parser)
+    add_site_argument(parser)
+    add_report_argument(parser)
+    add_snapshot_argument(parser)
+    add_shard_arguments(parser)
+    add_resume_argument(parser)
+    add_forensics_arguments(parser)
+    return parser.parse_args()
+
+
+async def build(sections: list[str], jobs: int = JOBS, keep_going: bool = False,
+                cache: bool = True, virtual_time: int = 0, site=None, report=None,
+                snapshot: str = SNAPSHOT, shard=None, shard_root=None,
+                resume: bool = False, forensics=None,
+                page_budget: float = PAGE_BUDGET_S) -> bool:
+    sections = [name for name in SECTIONS if name in sections]
+    out_dir, owned = Path("."), {}
+    if shard:
+        # Only this shard's share of the combined manifest (see shards.py)
+        manifest = combined_manifest(SECTIONS)
+        owned = shard_pages(manifest, *shard)
+        sections = [name for name in sections if name in owned]
+        out_dir = shard_dir(shard_root, *shard)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        print(f"🧩 Shard {shard[0]}/{shard[1]}: {sum(len(p) for p in owned.values())} páginas")
+    # One journal per output directory, so shards on one machine don't collide
+    journal = Journal(out_dir / JOURNAL_DIR, resume=resume)
+    if resume:
+        print(f"↩️  Reanudando: {len(journal.entries)} página(s) en el diario")
+    sem = asyncio.Semaphore(max(1, jobs))
+    start = time.perf_counter()
+    merged_by_name = {}
+
+    async def section(pool, name):
+        mod = SECTIONS[name]
+        merged = await section_pages(mod, pool, sem=sem, keep_going=keep_going, cache=cache,
+                                     virtual_time=virtual_time, snapshot=snapshot,
+                                     only=owned.get(name) if shard else None,
+                                     journal=journal, forensics=forensics,
+                                     page_budget=page_budget)
+        # Save off the event loop so other sections keep rendering
+        out = out_dir / mod.OUT
+        await asyncio.to_thread(merged.save, out)
+        merged_by_name[name] = (merged, out)
+        if merged.missing:
+            print(f"⚠️  {name}: {merged.missing} página(s) fallida(s)")
+        return merged.missing == 0
+
+    async with async_playwright() as play:
+        # Every section lives on the same origin, so one site table serves them all
+        async with BrowserPool(play, args=LAUNCH_ARGS, size=pool_size(jobs),
+                               **pool_options(site, build_mutators_pdf.BASE)) as pool:
+            tasks = [asyncio.ensure_future(section(pool, name)) for name in sections]
+            try:
+                results = await asyncio.gather(*tasks)
+            except Exception as e:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                journal.close()
+                print(f"❌ Error: {e}. Deteniendo ejecución (usa --resume para continuar).")
+                return False
+
+    for name, ok in zip(sections, results):
+        print(f"{'✅' if ok else '⚠️ '} {name}")
+    if shard:
+        write_shard_index(shard_root, *shard, manifest,
+                          {n: merged_by_name[n][1] for n in sections})
+    if report:
+        write_report(report, {n: merged_by_name[n] for n in sections},
+                     time.perf_counter() - start, pool)
+    assets = asset_cache()
+    print(f"📦 Assets: {assets.misses} descargados, {assets.hits} servidos desde caché")
+    if all(results):
+        journal.finish()
     else:
-        print(f"✅ {script} completado correctamente.")
+        journal.close()  # failed pages can be retried with --resume
+    return all(results)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    ok = asyncio.run(build(args.sections, args.jobs, args.keep_going, args.cache,
+                           args.virtual_time, args.site, args.report, args.snapshot,
+                           args.shard, args.shard_dir, args.resume, args.forensics,
+                           args.page_budget))
+    sys.exit(0 if ok else 1)
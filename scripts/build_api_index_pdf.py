@@ -1,20 +1,28 @@
 #!/usr/bin/env python3
 
+import argparse
 import asyncio
 from pathlib import Path
 from playwright.async_api import async_playwright, TimeoutError as PWTimeout
 
+from browser_pool import BrowserPool
+from build_report import timed
+from canvas_snapshot import SNAPSHOT, add_snapshot_argument, snapshot_canvases
+from lazy_content import install as install_lazy_content, reveal as reveal_lazy_content
+from section_runner import pool_options, render_section
+from sketch_ready import install as install_sketch_ready, wait_frame
+from static_site import add_site_argument
+from virtual_time import add_virtual_time_argument, goto_virtual
+
 # ===== CONFIG =====
 BASE = "http://localhost:1313/p5.quadrille.js/"  # e.g. "http://localhost:1313/"
 API_INDEX = ""              # _index.md for the Quadrille API
 OUT = "quadrille-api-index.pdf"
+PATHS = [API_INDEX]
 
 VIEWPORT = {"width": 1600, "height": 2400}
 NAV_TIMEOUT_MS = 45000
-SCROLL_STEPS = 14
-SCROLL_PAUSE_MS = 200
-EXTRA_CANVAS_WAIT_MS = 900
-EXTRA_IMAGE_WAIT_MS = 400
+FRAMES_DEADLINE_MS = 30000  # all frames together, not per frame
 
 PRINT_MARGIN = {"top": "14mm", "right": "14mm", "bottom": "14mm", "left": "14mm"}
 
@@ -30,27 +38,6 @@ LAUNCH_ARGS = [
 ]
 # ===================
 
-async def scroll_frame(frame):
-  try:
-    await frame.evaluate(
-      """
-      async ({steps, pause}) => {
-        const total = Math.max(
-          document.body.scrollHeight, document.documentElement.scrollHeight
-        )
-        const step = Math.max(1, Math.round((total - window.innerHeight)/steps))
-        for (let i = 0; i < steps; i++) {
-          window.scrollBy(0, step)
-          await new Promise(r => setTimeout(r, pause))
-        }
-        window.scrollTo(0, 0)
-      }
-      """,
-      {"steps": SCROLL_STEPS, "pause": SCROLL_PAUSE_MS}
-    )
-  except Exception:
-    pass
-
 async def wait_images(frame):
   try:
     await frame.wait_for_function(
@@ -67,55 +54,52 @@ async def wait_images(frame):
   except PWTimeout:
     pass
 
-async def wait_canvases(frame):
-  try:
-    await frame.wait_for_function(
-      """
-      () => {
-        const cs = Array.from(document.querySelectorAll('canvas'))
-        if (cs.length === 0) return true
-        return cs.every(c => (c.width|0) > 0 && (c.height|0) > 0)
-      }
-      """,
-      timeout=18000
-    )
-  except PWTimeout:
-    pass
-
 async def wait_media_in_frame(frame):
-  # Progressive scroll (trigger lazy draws), then wait for media
-  await scroll_frame(frame)
-  await wait_images(frame)
-  await frame.wait_for_timeout(EXTRA_IMAGE_WAIT_MS)
-  await wait_canvases(frame)
-  await frame.wait_for_timeout(EXTRA_CANVAS_WAIT_MS)
+  # Lazy content was already forced by reveal_lazy_content(); wait for media
+  try:
+    await wait_images(frame)
+    await wait_frame(frame)
+  except Exception:
+    pass  # detached or navigated away: nothing left to wait for
 
 async def wait_everything(page):
-  # Main document
-  await wait_media_in_frame(page.main_frame)
-
-  # Direct child iframes (p5-global-iframe) and any nested frames
-  checked = set()
-  async def dfs(f):
-    if f in checked:
-      return
-    checked.add(f)
-    await wait_media_in_frame(f)
-    for c in f.child_frames:
-      await dfs(c)
-  for fr in page.frames:
-    await dfs(fr)
-
-async def render_api_index():
-  async with async_playwright() as play:
-    browser = await play.chromium.launch(headless=True, args=LAUNCH_ARGS)
-    ctx = await browser.new_context(viewport=VIEWPORT)
+  # Start lazy images, iframes and observer-gated sketches everywhere
+  await reveal_lazy_content(page)
+
+  # Every frame (main document, p5-global-iframe embeds and nested frames) is
+  # waited on exactly once, all at the same time, under one deadline; frames
+  # attached meanwhile join in the next round
+  loop = asyncio.get_running_loop()
+  deadline = loop.time() + FRAMES_DEADLINE_MS / 1000
+  seen = set()
+  while True:
+    fresh = [f for f in page.frames if f not in seen and not f.is_detached()]
+    remaining = deadline - loop.time()
+    if not fresh or remaining <= 0:
+      break
+    seen.update(fresh)
+    try:
+      await asyncio.wait_for(
+        asyncio.gather(*(wait_media_in_frame(f) for f in fresh)), remaining
+      )
+    except asyncio.TimeoutError:
+      print(f"  ⚠️  {len(seen)} frame(s): plazo de {FRAMES_DEADLINE_MS} ms agotado")
+      break
+
+async def render_to_pdf(pool, base: str, rel_path: str, virtual_time: int = 0,
+                        snapshot: str = SNAPSHOT) -> bytes:
+  async with pool.context(viewport=VIEWPORT) as ctx:
+    await install_sketch_ready(ctx)
+    await install_lazy_content(ctx)
     page = await ctx.new_page()
     await page.emulate_media(media="print")
 
-    url = f"{BASE}{API_INDEX}"
+    url = f"{base}{rel_path}"
     print(f"→ {url}")
-    await page.goto(url, wait_until="networkidle", timeout=NAV_TIMEOUT_MS)
+    if virtual_time:
+      await timed("virtual_time", goto_virtual(ctx, page, url, virtual_time, NAV_TIMEOUT_MS))
+    else:
+      await timed("goto", page.goto(url, wait_until="networkidle", timeout=NAV_TIMEOUT_MS))
 
     # Gentle print CSS to reduce awkward breaks
     await page.add_style_tag(content="""
@@ -126,21 +110,39 @@ async def render_api_index():
     """)
 
     # Wait for media across main page + iframes (p5, images, videos, canvases)
-    await wait_everything(page)
+    if not virtual_time:
+      await timed("frames", wait_everything(page))
+
+    # Canvases print as still images (see canvas_snapshot.py)
+    await timed("snapshot", snapshot_canvases(page, snapshot))
 
     # Print
-    await page.pdf(
-      path=OUT,
+    return await timed("pdf", page.pdf(
       print_background=True,
       display_header_footer=False,
       prefer_css_page_size=True,
       margin=PRINT_MARGIN,
       scale=1.0
-    )
+    ))
+
+async def render_pages(pool, virtual_time: int = 0, snapshot: str = SNAPSHOT, **opts):
+  # Entry point shared with build_all_pdfs.py (opts go to render_section)
+  return await render_section(
+    PATHS, lambda p: render_to_pdf(pool, BASE, p, virtual_time, snapshot),
+    base=BASE, variant=f"vt={virtual_time},snap={snapshot}", **opts
+  )
 
-    await ctx.close()
-    await browser.close()
-    print(f"✅ Done: {OUT}")
+async def render_api_index(virtual_time: int = 0, site=None, snapshot: str = SNAPSHOT):
+  async with async_playwright() as play:
+    async with BrowserPool(play, args=LAUNCH_ARGS, **pool_options(site, BASE)) as pool:
+      data = await render_to_pdf(pool, BASE, API_INDEX, virtual_time, snapshot)
+  Path(OUT).write_bytes(data)
+  print(f"✅ Done: {OUT}")
 
 if __name__ == "__main__":
-  asyncio.run(render_api_index())
+  parser = argparse.ArgumentParser(description="Build the Quadrille API index PDF")
+  add_virtual_time_argument(parser)
+  add_site_argument(parser)
+  add_snapshot_argument(parser)
+  args = parser.parse_args()
+  asyncio.run(render_api_index(args.virtual_time, args.site, args.snapshot))
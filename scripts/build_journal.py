@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# Checkpoint journal for long builds (build_all_pdfs.py --resume).
+#
+# Every page that finishes rendering appends a line {url, key, file} to
+# JOURNAL_DIR/journal.jsonl. The bytes normally live in the page cache
+# already (under `key`), so the journal only points at them; the PDF is
+# copied into JOURNAL_DIR (`file`) only when the cache is off. A --resume
+# run takes finished pages from the journal instead of rendering them again,
+# as long as their content key (computed with the cache off too) still
+# matches, so a crash or a timeout on a heavy visual_algorithms page only
+# costs the pages that hadn't finished.
+# Lines are flushed as they are written, which survives a killed build, and
+# fsynced once on close. A fresh run starts a new journal; a successful
+# build removes it.
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+# ===== CONFIG =====
+JOURNAL_DIR = ".pdf-build-journal"
+# ===================
+
+
+class Journal:
+    def __init__(self, root=JOURNAL_DIR, resume: bool = False):
+        self.root = Path(root)
+        if not resume:
+            shutil.rmtree(self.root, ignore_errors=True)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.log_path = self.root / "journal.jsonl"
+        self.entries = self._load()
+        self.resumed = 0
+        self._log = open(self.log_path, "a", encoding="utf-8")
+        self._lock = threading.Lock()  # record() runs on worker threads
+
+    def _load(self) -> dict:
+        entries = {}
+        try:
+            lines = self.log_path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            return entries
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # torn last line from a crash
+            entries[entry["url"]] = entry
+        return entries
+
+    def done(self, url: str, key: str | None) -> bool:
+        # Finished by an earlier run, with the same content key; a page whose
+        # key can't be computed is never taken as done
+        entry = self.entries.get(url)
+        return entry is not None and key is not None and entry["key"] == key
+
+    def get(self, url: str, key: str | None) -> bytes | None:
+        # A page copied into the journal (cache off); cached pages come from
+        # the page cache itself
+        if not self.done(url, key) or not self.entries[url]["file"]:
+            return None
+        try:
+            data = (self.root / self.entries[url]["file"]).read_bytes()
+        except OSError:
+            return None
+        self.resumed += 1
+        return data
+
+    def record(self, url: str, key: str, data: bytes | None = None):
+        # `data` only when the page cache doesn't hold it
+        name = None
+        if data is not None:
+            name = hashlib.sha256(url.encode()).hexdigest()[:24] + ".pdf"
+            part = self.root / (name + ".part")
+            part.write_bytes(data)
+            os.replace(part, self.root / name)
+        entry = {"url": url, "key": key, "file": name, "time": round(time.time(), 3)}
+        with self._lock:
+            self.entries[url] = entry
+            self._log.write(json.dumps(entry) + "\n")
+            self._log.flush()
+
+    def close(self):
+        with self._lock:
+            if not self._log.closed:
+                os.fsync(self._log.fileno())
+                self._log.close()
+
+    def finish(self):
+        # The build completed: nothing left to resume
+        self.close()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def add_resume_argument(parser):
+    parser.add_argument("--resume", action="store_true",
+                        help="reuse pages finished by an interrupted build (see build_journal.py)")
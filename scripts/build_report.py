@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# Per-page phase timings and the JSON build report (--report FILE).
+#
+# render_section() gives every page task its own PageTiming through a
+# context variable, so code deep inside a render (the browser pool launching
+# Chromium, a script's goto or page.pdf) just wraps its work in
+# phase("name") / timed("name", awaitable) and the time lands on the right
+# page. Phases are summed when a page is retried.
+
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+
+# ===== CONFIG =====
+SLOWEST_PAGES = 10
+LAST_REQUESTS = 3  # per page: the requests that finished last
+# ===================
+
+_current = ContextVar("page_timing", default=None)
+
+
+class PageTiming:
+    def __init__(self, path: str):
+        self.path = path
+        self.phases = {}  # name -> seconds
+        self.cached = False
+        self.bytes = 0
+        self.pages = 0
+        self.error = None
+        self.attempts = 0  # > 1: requeued after a failure or a hang
+        self.blocked = 0
+        self.last_requests = deque(maxlen=LAST_REQUESTS)
+        self._start = time.perf_counter()
+        self.total = 0.0
+
+    def finish(self):
+        self.total = time.perf_counter() - self._start
+
+    def add(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def finish_request(self, url: str, start: float, end: float, failed: bool = False):
+        # Called in finishing order, so the deque ends up holding the last ones
+        self.last_requests.append({
+            "url": url,
+            "ms": round((end - start) * 1000),
+            "end_ms": round((end - self._start) * 1000),
+            "failed": failed,
+        })
+
+    def as_dict(self) -> dict:
+        return {
+            "path": self.path,
+            "cached": self.cached,
+            "bytes": self.bytes,
+            "pages": self.pages,
+            "total_s": round(self.total, 3),
+            "phases": {k: round(v, 3) for k, v in self.phases.items()},
+            "error": self.error,
+            "attempts": self.attempts,
+            "blocked": self.blocked,
+            "last_requests": list(self.last_requests)[::-1],
+        }
+
+
+def current_timing() -> PageTiming | None:
+    return _current.get()
+
+
+def track(timing: PageTiming):
+    # Bind `timing` to the current task (render_section does this per page)
+    _current.set(timing)
+
+
+@contextmanager
+def phase(name: str, timing: PageTiming | None = None):
+    timing = timing or _current.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timing is not None:
+            timing.add(name, time.perf_counter() - start)
+
+
+async def timed(name: str, awaitable):
+    with phase(name):
+        return await awaitable
+
+
+def section_report(merged, out=None) -> dict:
+    timings = [t for t in merged.timings if t is not None]
+    phases = {}
+    for t in timings:
+        for name, s in t.phases.items():
+            phases[name] = phases.get(name, 0.0) + s
+    phases["optimize"] = merged.optimize_seconds
+    phases["save"] = merged.save_seconds - merged.optimize_seconds
+    out = Path(out) if out else None
+    slowest = sorted((t for t in timings if not t.cached), key=lambda t: -t.total)
+    return {
+        "out": str(out) if out else None,
+        "bytes": out.stat().st_size if out and out.exists() else None,
+        "pdf_pages": len(merged.pdf.pages),
+        "rendered": merged.rendered,
+        "missing": merged.missing,
+        "duplicate_streams": merged.duplicates,
+        "cached": sum(t.cached for t in timings),
+        "phases_s": {k: round(v, 3) for k, v in phases.items()},
+        "slowest": [t.path for t in slowest[:SLOWEST_PAGES]],
+        "items": [t.as_dict() for t in timings],
+    }
+
+
+def write_report(path, sections: dict, wall: float, pool=None):
+    # sections: name -> (SectionMerger, output path)
+    report = {
+        "generated": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "wall_s": round(wall, 3),
+        "browser_launches": pool.launches if pool else None,
+        "browser_kills": pool.kills if pool else None,
+        "browsers_recycled": pool.recycled if pool else None,
+        "sections": {name: section_report(m, out) for name, (m, out) in sections.items()},
+    }
+    path = Path(path)
+    path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"📊 Informe: {path}")
+    return report
+
+
+def add_report_argument(parser):
+    parser.add_argument("--report", metavar="FILE",
+                        help="write per-page phase timings as JSON to FILE")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# Replace live canvases with still images right before page.pdf().
+#
+# Printing re-rasterizes every 2D/WebGL canvas through swiftshader and embeds
+# it as a large bitmap. Once the page has settled, each p5 loop is stopped
+# and every <canvas> is swapped for an <img> encoded from its current pixels
+# (PNG, or JPEG flattened on white with a given quality), so the print step
+# only lays out images.
+
+import argparse
+import asyncio
+
+# ===== CONFIG =====
+SNAPSHOT = "png"  # "png", "jpeg[:QUALITY]" (QUALITY 1-100) or "off"
+JPEG_QUALITY = 85
+# ===================
+
+SNAPSHOT_JS = """
+async ({type, quality}) => {
+  for (const p of window.__sketchInstances ? window.__sketchInstances() : []) {
+    try { p.noLoop() } catch (e) {}
+  }
+  const encode = canvas => {
+    let src = canvas
+    if (type === 'image/jpeg') {
+      // JPEG has no alpha: flatten onto white like the printed page
+      src = document.createElement('canvas')
+      src.width = canvas.width
+      src.height = canvas.height
+      const g = src.getContext('2d')
+      g.fillStyle = '#fff'
+      g.fillRect(0, 0, src.width, src.height)
+      g.drawImage(canvas, 0, 0)
+    }
+    return src.toDataURL(type, quality)
+  }
+  const bytes = url => Math.floor(url.length * 3 / 4)
+  const blanks = new Map()  // "WxH" -> encoded size of an empty canvas that size
+  const blank = (width, height) => {
+    const key = `${width}x${height}`
+    if (!blanks.has(key)) {
+      const empty = document.createElement('canvas')
+      empty.width = width
+      empty.height = height
+      blanks.set(key, bytes(encode(empty)))
+    }
+    return blanks.get(key)
+  }
+  const sizes = []
+  for (const canvas of [...document.querySelectorAll('canvas')]) {
+    const rect = canvas.getBoundingClientRect()
+    if (!canvas.width || !canvas.height || !rect.width || !rect.height) continue
+    let url
+    try { url = encode(canvas) } catch (e) { continue }  // tainted
+    const img = new Image()
+    img.src = url
+    img.className = canvas.className
+    img.style.cssText = canvas.style.cssText
+    img.style.width = `${rect.width}px`
+    img.style.height = `${rect.height}px`
+    const display = getComputedStyle(canvas).display
+    img.style.display = display === 'inline' ? 'inline-block' : display
+    sizes.push([bytes(url), blank(canvas.width, canvas.height)])
+    canvas.replaceWith(img)
+    await img.decode().catch(() => {})
+  }
+  return sizes
+}
+"""
+
+
+def parse_snapshot(spec: str):
+    # "png" | "jpeg[:QUALITY]" | "off" -> (mime, quality) or None
+    kind, _, quality = spec.lower().partition(":")
+    if kind == "off":
+        return None
+    if kind == "png" and not quality:
+        return "image/png", None
+    if kind in ("jpeg", "jpg"):
+        q = int(quality) if quality else JPEG_QUALITY
+        if 1 <= q <= 100:
+            return "image/jpeg", q / 100
+    raise ValueError(f"formato de captura no válido: {spec!r}")
+
+
+def _snapshot_type(spec: str) -> str:
+    try:
+        parse_snapshot(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return spec
+
+
+def add_snapshot_argument(parser):
+    parser.add_argument("--snapshot", type=_snapshot_type, default=SNAPSHOT, metavar="FMT",
+                        help=f"print canvases as png, jpeg[:QUALITY] or off (default: {SNAPSHOT})")
+
+
+async def snapshot_frame(frame, spec: str = SNAPSHOT) -> list[tuple[int, int]]:
+    fmt = parse_snapshot(spec)
+    if fmt is None:
+        return []
+    mime, quality = fmt
+    try:
+        sizes = await frame.evaluate(SNAPSHOT_JS, {"type": mime, "quality": quality})
+    except Exception:
+        # Detached frame: its canvases print live
+        return []
+    return [tuple(s) for s in sizes]
+
+
+async def snapshot_canvases(page, spec: str = SNAPSHOT) -> list[tuple[int, int]]:
+    # (encoded size, encoded size of a blank canvas as large) of every canvas
+    # replaced, across all frames: a canvas nothing was drawn on has the two equal
+    sizes = await asyncio.gather(*(snapshot_frame(f, spec) for f in page.frames))
+    return [s for frame_sizes in sizes for s in frame_sizes]
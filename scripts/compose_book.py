@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# Stitches the finished section PDFs into one book, without a browser.
+#
+# Each section PDF comes with a <stem>.index.json sidecar (written by
+# SectionMerger.save) saying where every doc page starts. The book gets one
+# outline entry per section with a child per doc page, titled from the
+# content/docs front matter, and page labels numbering each section from 1
+# ("Mutators 3"). Sections that haven't been built are skipped with a warning.
+
+import argparse
+import os
+from pathlib import Path
+from pikepdf import Array, Dictionary, Name, OutlineItem, Pdf, String
+
+from build_all_pdfs import SECTIONS
+from manifest import section_pages
+from pdf_optimize import OPTIMIZE, SAVE_OPTIONS, optimize as optimize_pdf
+from section_runner import read_index
+
+# ===== CONFIG =====
+OUT = "quadrille-api-book.pdf"
+TITLE = "p5.quadrille.js API"
+SECTION_TITLES = {"api_index": "Quadrille API"}
+# ===================
+
+
+def section_title(name: str) -> str:
+    if name in SECTION_TITLES:
+        return SECTION_TITLES[name]
+    pages = section_pages(name)
+    return pages[0].title if pages else name.replace("_", " ").capitalize()
+
+
+def page_titles(name: str) -> dict:
+    return {p.path: p.title for p in section_pages(name)}
+
+
+def _fallback_title(path: str) -> str:
+    return path.rstrip("/").rsplit("/", 1)[-1].replace("_", " ") or "index"
+
+
+def compose(sections=None, out=OUT, optimize: bool = OPTIMIZE) -> Path | None:
+    sections = [n for n in SECTIONS if not sections or n in sections]
+    book = Pdf.new()
+    sources = []  # kept open until save
+    labels = []
+    try:
+        with book.open_outline() as outline:
+            for name in sections:
+                pdf_path = Path(SECTIONS[name].OUT)
+                if not pdf_path.exists():
+                    print(f"⚠️  Falta {pdf_path}; sección omitida")
+                    continue
+                src = Pdf.open(pdf_path)
+                sources.append(src)
+                start = len(book.pages)
+                book.pages.extend(src.pages)
+                title = section_title(name)
+                item = OutlineItem(title, start)
+                titles = page_titles(name)
+                index = read_index(pdf_path)
+                if index is None:
+                    print(f"⚠️  {pdf_path} no tiene índice; sin marcadores por página")
+                for i, page in enumerate(index or []):
+                    if page["count"] and i > 0:  # the first page is the section itself
+                        label = titles.get(page["path"]) or _fallback_title(page["path"])
+                        item.children.append(OutlineItem(label, start + page["first"]))
+                outline.root.append(item)
+                labels += [start, Dictionary(S=Name.D, P=String(f"{title} "))]
+                print(f"[{len(outline.root):02d}] {title}: {len(src.pages)} páginas")
+
+        if not sources:
+            print("❌ No hay secciones construidas.")
+            return None
+        book.Root.PageLabels = Dictionary(Nums=Array(labels))
+        book.docinfo[Name.Title] = TITLE
+        book.Root.PageMode = Name.UseOutlines
+        if optimize:
+            optimize_pdf(book)
+        out = Path(out)
+        part = out.with_name(out.name + ".part")
+        book.save(part, **(SAVE_OPTIONS if optimize else {}))
+        os.replace(part, out)
+    finally:
+        for src in sources:
+            src.close()
+    print(f"✅ Libro: {out} ({len(sources)} secciones)")
+    return out
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compose the full API book from the section PDFs")
+    parser.add_argument("--sections", nargs="+", choices=list(SECTIONS), metavar="SECTION",
+                        help="sections to include (default: all that exist)")
+    parser.add_argument("--out", default=OUT, help=f"output file (default: {OUT})")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    compose(args.sections, args.out)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# Start lazy content at once instead of scrolling the page to find it.
+#
+# LAZY_INIT_JS (a context init script) makes IntersectionObserver report
+# every observed element as visible as soon as it is observed, so sketches
+# gated on entering the viewport start right away, and later "left the
+# viewport" entries for them are dropped. reveal() then switches lazy
+# images/iframes to eager in every frame and, when the page fits under
+# TALL_VIEWPORT_MAX, shows it in one tall viewport for a couple of frames.
+# Short pages cost one evaluate; only pages with lazy iframes wait on the
+# network again.
+
+import asyncio
+
+# ===== CONFIG =====
+TALL_VIEWPORT_MAX = 16000  # px; taller pages keep their viewport
+SETTLE_RAFS = 2
+LAZY_IDLE_TIMEOUT_MS = 10000
+# ===================
+
+LAZY_INIT_JS = """
+(() => {
+  const IO = window.IntersectionObserver
+  if (!IO || IO.__forced) return
+  class ForcedObserver extends IO {
+    constructor(callback, options) {
+      const forced = new WeakSet()
+      super((entries, observer) => {
+        // Keep the sketch running once it has been told it is visible
+        const kept = entries.filter(e => e.isIntersecting || !forced.has(e.target))
+        if (kept.length) callback(kept, observer)
+      }, options)
+      this.__forced = forced
+      this.__callback = callback
+    }
+    observe(el) {
+      super.observe(el)
+      this.__forced.add(el)
+      setTimeout(() => {
+        const rect = el.getBoundingClientRect()
+        this.__callback([{
+          target: el, time: performance.now(), rootBounds: null,
+          boundingClientRect: rect, intersectionRect: rect,
+          intersectionRatio: 1, isIntersecting: true, isVisible: true,
+        }], this)
+      }, 0)
+    }
+  }
+  ForcedObserver.__forced = true
+  window.IntersectionObserver = ForcedObserver
+})()
+"""
+
+REVEAL_JS = """
+() => {
+  let iframes = 0
+  for (const el of document.querySelectorAll('img[loading="lazy"], iframe[loading="lazy"]')) {
+    el.loading = 'eager'
+    if (el.tagName === 'IFRAME') iframes++
+  }
+  for (const el of document.querySelectorAll('img[data-src], iframe[data-src]')) {
+    if (!el.getAttribute('src')) {
+      el.src = el.dataset.src
+      if (el.tagName === 'IFRAME') iframes++
+    }
+  }
+  for (const el of document.querySelectorAll('img[data-srcset]')) {
+    if (!el.srcset) el.srcset = el.dataset.srcset
+  }
+  const height = Math.max(
+    document.body?.scrollHeight || 0, document.documentElement.scrollHeight
+  )
+  return {height, iframes}
+}
+"""
+
+RAFS_JS = """
+n => new Promise(resolve => {
+  const step = k => (k <= 0 ? resolve() : requestAnimationFrame(() => step(k - 1)))
+  step(n)
+})
+"""
+
+
+async def install(ctx):
+    await ctx.add_init_script(LAZY_INIT_JS)
+
+
+async def force_frame(frame) -> dict:
+    try:
+        return await frame.evaluate(REVEAL_JS)
+    except Exception:
+        # Detached or cross-origin frame: nothing to force
+        return {"height": 0, "iframes": 0}
+
+
+async def reveal(page, max_height: int = TALL_VIEWPORT_MAX):
+    # Force lazy content in every frame; cost follows what the page contains
+    found = await asyncio.gather(*(force_frame(f) for f in page.frames))
+    height = found[0]["height"] if found else 0
+    if any(f["iframes"] for f in found):
+        try:
+            await page.wait_for_load_state("networkidle", timeout=LAZY_IDLE_TIMEOUT_MS)
+        except Exception:
+            pass
+    viewport = page.viewport_size
+    if viewport and viewport["height"] < height <= max_height:
+        await page.set_viewport_size({"width": viewport["width"], "height": height})
+        try:
+            await page.evaluate(RAFS_JS, SETTLE_RAFS)
+        finally:
+            await page.set_viewport_size(viewport)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# Page manifests discovered from the content/docs tree.
+#
+# Walks content/docs/<section> the way Hugo builds its URLs: a branch's
+# _index.md comes first, then its children (single pages, leaf bundles and
+# sub-branches) sorted like the Book menu, by front-matter weight then title.
+# Drafts and non-default-language files (foo.es.md) are skipped. Results are
+# cached for the lifetime of the process.
+
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
+
+# ===== CONFIG =====
+CONTENT_DIR = Path(__file__).resolve().parent.parent / "content"
+DOCS = "docs"
+LANGUAGE_RE = re.compile(r"\.[a-z]{2}(-[a-z]{2})?$", re.IGNORECASE)
+# ===================
+
+FRONT_MATTER_RE = re.compile(r"\A(---|\+\+\+)\s*\n(.*?)\n\1\s*(\n|\Z)", re.S)
+FIELD_RE = re.compile(r"""^([A-Za-z_]\w*)\s*[:=]\s*(.*?)\s*$""", re.M)
+
+
+class Page(NamedTuple):
+    path: str        # rel URL, e.g. "docs/mutators/clear/clear_row/"
+    source: Path     # Markdown file it is built from
+    title: str
+    weight: int
+
+
+def front_matter(md: Path) -> dict:
+    # Top-level scalar fields of YAML or TOML front matter (enough for ordering)
+    m = FRONT_MATTER_RE.match(md.read_text(encoding="utf-8", errors="replace"))
+    if not m:
+        return {}
+    fields = {}
+    for key, value in FIELD_RE.findall(m.group(2)):
+        fields.setdefault(key.lower(), value.strip("\"'"))
+    return fields
+
+
+def _weight(fields: dict) -> int:
+    try:
+        return int(fields.get("weight", 0))
+    except ValueError:
+        return 0
+
+
+def _page(md: Path, url: str) -> Page | None:
+    fields = front_matter(md)
+    if fields.get("draft", "").lower() == "true":
+        return None
+    if fields.get("url"):
+        url = fields["url"].strip("/") + "/"
+    elif fields.get("slug"):
+        url = url.rstrip("/").rsplit("/", 1)[0] + f"/{fields['slug']}/"
+    return Page(url, md, fields.get("title", md.stem), _weight(fields))
+
+
+def _order(page: Page):
+    # Hugo: weighted pages first (ascending), then by title
+    return (page.weight == 0, page.weight, page.title.lower(), page.path)
+
+
+def _walk(folder: Path, url: str) -> list[Page]:
+    index = folder / "_index.md"
+    head = _page(index, url) if index.exists() else None
+    if index.exists() and head is None:
+        return []  # draft branch: Hugo drops the whole subtree
+    children = []  # (Page, pages of its subtree)
+    for entry in folder.iterdir():
+        if entry.name.startswith((".", "_")):
+            continue
+        if entry.is_dir():
+            if (entry / "_index.md").exists():
+                sub = _walk(entry, f"{url}{entry.name}/")
+                if sub:
+                    children.append((sub[0], sub))
+            elif (entry / "index.md").exists():
+                leaf = _page(entry / "index.md", f"{url}{entry.name}/")
+                if leaf:
+                    children.append((leaf, [leaf]))
+        elif entry.suffix == ".md" and not LANGUAGE_RE.search(entry.stem):
+            single = _page(entry, f"{url}{entry.stem}/")
+            if single:
+                children.append((single, [single]))
+    pages = [head] if head else []
+    for _, subtree in sorted(children, key=lambda c: _order(c[0])):
+        pages.extend(subtree)
+    return pages
+
+
+@lru_cache(maxsize=None)
+def section_pages(section: str) -> tuple[Page, ...]:
+    folder = CONTENT_DIR / DOCS / section
+    if not folder.is_dir():
+        return ()
+    return tuple(_walk(folder, f"{DOCS}/{section}/"))
+
+
+def section_paths(section: str, fallback=()) -> list[str]:
+    # Falls back to a hand-written list when the section's submodule isn't checked out
+    return [p.path for p in section_pages(section)] or list(fallback)
+
+
+if __name__ == "__main__":
+    import sys
+    for section in sys.argv[1:]:
+        for p in section_pages(section):
+            print(f"{p.weight:>4}  {p.path}  ({p.source.relative_to(CONTENT_DIR)})")
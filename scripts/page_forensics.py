@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# Slow-page forensics (--forensics DIR): find out why a page took so long.
+#
+# Normal renders carry no tracing at all. When a page ends up over its time
+# budget (PAGE_BUDGET_S, or --page-budget), render_section() renders it once
+# more with a capture bound to the task: every context the render opens then
+# records a HAR (BrowserPool passes context_options()), a Playwright trace
+# with screenshots and DOM snapshots, and a CPU profile of each of its pages.
+# They land in DIR/<page>/ next to timing.json, the timings of the slow run.
+# Open trace-N.zip with `playwright show-trace`, cpu-N-M.cpuprofile in the
+# DevTools Performance panel.
+
+import json
+from contextvars import ContextVar
+from pathlib import Path
+
+from build_report import PageTiming, track
+
+# ===== CONFIG =====
+PAGE_BUDGET_S = 30
+PROFILER_INTERVAL_US = 200  # CPU profiler sampling interval
+# ===================
+
+_capture = ContextVar("page_forensics", default=None)
+
+
+def add_forensics_arguments(parser):
+    parser.add_argument("--forensics", metavar="DIR",
+                        help="trace, HAR and CPU-profile pages that go over their budget into DIR")
+    parser.add_argument("--page-budget", type=float, default=PAGE_BUDGET_S, metavar="S",
+                        help=f"seconds a page may take before --forensics kicks in "
+                             f"(default: {PAGE_BUDGET_S})")
+
+
+def page_folder(root, rel_path: str) -> Path:
+    return Path(root) / (rel_path.strip("/").replace("/", "_") or "index")
+
+
+class Capture:
+    # Everything recorded for one page; contexts are numbered in opening order
+    def __init__(self, folder):
+        self.folder = Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.contexts = 0
+
+    def context_options(self) -> dict:
+        self.contexts += 1
+        return {
+            "record_har_path": str(self.folder / f"network-{self.contexts}.har"),
+            "record_har_content": "omit",
+        }
+
+    async def start(self, ctx):
+        n = self.contexts
+        profilers = []
+
+        async def profile(page):
+            cdp = await ctx.new_cdp_session(page)
+            await cdp.send("Profiler.enable")
+            await cdp.send("Profiler.setSamplingInterval", {"interval": PROFILER_INTERVAL_US})
+            await cdp.send("Profiler.start")
+            profilers.append(cdp)
+
+        await ctx.tracing.start(screenshots=True, snapshots=True)
+        ctx.on("page", profile)
+
+        async def stop():
+            # Before the context closes (which is when the HAR is written)
+            for m, cdp in enumerate(profilers, start=1):
+                try:
+                    result = await cdp.send("Profiler.stop")
+                except Exception:
+                    continue  # page already gone
+                target = self.folder / f"cpu-{n}-{m}.cpuprofile"
+                target.write_text(json.dumps(result["profile"]), encoding="utf-8")
+            await ctx.tracing.stop(path=self.folder / f"trace-{n}.zip")
+
+        return stop
+
+
+def context_options() -> dict:
+    # Extra new_context() options for the current task (BrowserPool)
+    current = _capture.get()
+    return current.context_options() if current else {}
+
+
+async def install(ctx):
+    # BrowserPool hook: starts recording when the task is being captured and
+    # returns the teardown that saves it
+    current = _capture.get()
+    if current is not None:
+        return await current.start(ctx)
+
+
+async def capture(root, rel_path: str, render, timing: PageTiming, budget: float):
+    # Render `rel_path` again under capture; the result is thrown away
+    recording = Capture(page_folder(root, rel_path))
+    folder = recording.folder
+    print(f"🔬 {rel_path}: {timing.total:.1f}s (presupuesto {budget:g}s); trazando en {folder}")
+    (folder / "timing.json").write_text(
+        json.dumps({"budget_s": budget, **timing.as_dict()}, indent=2, ensure_ascii=False),
+        encoding="utf-8",
+    )
+    _capture.set(recording)
+    track(PageTiming(rel_path))  # keep the traced run out of the build report
+    try:
+        await render(rel_path)
+    except Exception as e:
+        print(f"⚠️  {rel_path}: la captura también falló ({e})")
+    finally:
+        _capture.set(None)
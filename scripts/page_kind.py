@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# Static/dynamic classification of doc pages from their served HTML.
+#
+# A page is dynamic if it embeds anything that only shows up once scripts
+# run: canvases, iframes (p5-iframe), video, p5 / p5.quadrille scripts,
+# inline sketches, or client-side math and diagrams. Everything else (most
+# of accessors/cell_contents, properties, ...) is static: it renders with
+# JavaScript disabled, no swiftshader work and no readiness waits. Theme
+# scripts (menu, search) don't count; the print doesn't need them.
+
+import asyncio
+import re
+
+# ===== CONFIG =====
+DYNAMIC_RE = re.compile(
+    r"<canvas\b|<iframe\b|<video\b|<audio\b"
+    # p5, its addons (p5.quadrille, p5.sound, ...), KaTeX and Mermaid, by file
+    # name: every theme script is served under /p5.quadrille.js/ as well
+    r"|<script\b[^>]*\bsrc\s*=\s*[\"']?(?:[^\"'\s>]*/)?"
+    r"(?:p5(?:\.[\w-]+)*|katex[\w.-]*|mermaid[\w.-]*)\.js(?:\?[^\"'\s>]*)?(?=[\"'\s>])"
+    r"|\bnew\s+p5\s*\(|\bfunction\s+(?:setup|draw|preload)\s*\("
+    r"|\bclass\s*=\s*[\"'][^\"']*\b(?:katex|mermaid)\b",
+    re.IGNORECASE,
+)
+# ===================
+
+_kinds = {}  # url -> static?, for the lifetime of the process
+
+
+def is_static_html(html: str) -> bool:
+    return DYNAMIC_RE.search(html) is None
+
+
+def forget():
+    # Classify every page afresh, e.g. after its source changed
+    _kinds.clear()
+
+
+async def classify(url: str, fetch) -> bool:
+    # True if `url` can print with scripts off; unknown pages count as dynamic
+    if url not in _kinds:
+        try:
+            html = await asyncio.to_thread(fetch, url)
+            _kinds[url] = is_static_html(html.decode("utf-8", "replace"))
+        except Exception:
+            _kinds[url] = False
+    return _kinds[url]
+
+
+# Book theme <head> and bodies as hugo renders them, for `python page_kind.py`
+_BOOK_HEAD = """<head>
+<meta charset="UTF-8"><meta name="viewport" content="width=device-width, initial-scale=1.0">
+<link rel="stylesheet" href="/p5.quadrille.js/book.min.6c8b9d2a1fc95075ed7da46ca81060b39add8fff6741ac51259f768929281e2c.css" integrity="sha256-bIudKh/JUHXtfaRsqBBgs5rdj/9nQaxRJZ92iSkoHiw=" crossorigin="anonymous">
+<script defer src="/p5.quadrille.js/flexsearch.min.js"></script>
+<script defer src="/p5.quadrille.js/en.search.min.2c8b1b4c2b4f6a4d1f5c5d1c1b8e3c6c5b2b6d4c7a9e0f1a2b3c4d5e6f7a8b9c.js" integrity="sha256-LIsbTCtPak0fXF0cG44zbFsrbUx6ng8aKzxNXm96i5w=" crossorigin="anonymous"></script>
+</head>"""
+_EXPECTED = [
+    (_BOOK_HEAD + "<h1>isNumber</h1><p>Returns true if…</p>", True),
+    (_BOOK_HEAD + "<script src='https://cdn.jsdelivr.net/npm/p5@2.1.1/lib/p5.min.js'></script>", False),
+    (_BOOK_HEAD + "<script src='https://cdn.jsdelivr.net/npm/p5.quadrille/dist/p5.quadrille.min.js'></script>", False),
+    (_BOOK_HEAD + "<script src=/p5.quadrille.js/p5.quadrille.js></script>", False),
+    (_BOOK_HEAD + "<iframe srcdoc=\"...\"></iframe>", False),
+    (_BOOK_HEAD + "<script>function setup() {}</script>", False),
+]
+
+
+if __name__ == "__main__":
+    for html, static in _EXPECTED:
+        assert is_static_html(html) is static, html[-120:]
+    print(f"✅ {len(_EXPECTED)} casos")
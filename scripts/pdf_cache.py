@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# Content-addressed cache of per-page PDFs.
+#
+# A page's key hashes the served HTML plus every same-origin asset it
+# references (scripts, styles, images, p5.quadrille.js, ...), and the assets
+# those scripts and styles load in turn (a sketch's loadImage('p3.jpg')). It
+# is salted with the section script that renders the page and the shared
+# modules in RENDER_MODULES, so a change to the render pipeline invalidates
+# every page it could affect. Unchanged pages are copied from the cache
+# instead of being rendered; the cache is trimmed oldest-first past a size cap.
+
+import asyncio
+import hashlib
+import html as htmllib
+import os
+import re
+import urllib.request
+from pathlib import Path
+from urllib.parse import urldefrag, urljoin, urlparse
+
+# ===== CONFIG =====
+CACHE_DIR = ".playwright-pdf-cache"
+CACHE_MAX_BYTES = 2 * 1024**3
+FETCH_TIMEOUT_S = 10
+CACHE_VERSION = "1"
+RENDER_MODULES = [  # shared code whose changes can alter a page's PDF
+    "section_runner.py", "sketch_ready.py", "lazy_content.py", "canvas_snapshot.py",
+    "request_filter.py", "virtual_time.py", "page_kind.py", "static_site.py",
+]
+SCANNED = (".js", ".mjs", ".css")  # assets whose bodies name further assets
+# ===================
+
+# src attributes and <link href> (quoted or not), CSS url(...) and quoted
+# asset paths in inline sketches. <a href> is navigation, not an asset: the
+# sidebar links every doc page, so keying on it would tie every page to all
+_IN_BODY = (
+    r"""url\(\s*["']?([^"')]+)["']?\s*\)"""
+    r"""|["']([^"'\s<>]+\.(?:js|mjs|css|png|jpe?g|gif|webp|svg|json|obj|glsl|frag|vert))["']"""
+)
+ASSET_RE = re.compile(
+    r"""\bsrc\s*=\s*(?:["']([^"'#]+)["']|([^\s"'<>#]+))"""
+    r"""|<link\b[^>]*?\bhref\s*=\s*(?:["']([^"'#]+)["']|([^\s"'<>#]+))|""" + _IN_BODY,
+    re.IGNORECASE,
+)
+# The same url(...) and quoted paths inside fetched scripts and styles
+BODY_RE = re.compile(_IN_BODY, re.IGNORECASE)
+# iframe documents inlined by the p5-iframe shortcodes (HTML-escaped)
+SRCDOC_RE = re.compile(r"""\bsrcdoc\s*=\s*(?:"([^"]*)"|'([^']*)')""", re.IGNORECASE)
+# <link>s to other documents (the RSS feed lists every page of the section)
+NAV_LINK_RE = re.compile(
+    r"""<link\b[^>]*\brel\s*=\s*["']?(?:canonical|alternate|prev|next|search)\b[^>]*>""",
+    re.IGNORECASE,
+)
+
+
+def _fetch(url: str) -> bytes:
+    with urllib.request.urlopen(url, timeout=FETCH_TIMEOUT_S) as r:
+        return r.read()
+
+
+def asset_urls(html: str, page_url: str) -> list[str]:
+    # Same-origin assets referenced by the page, sorted for a stable key
+    origin = urlparse(page_url).netloc
+    urls = set()
+    docs = [html]
+    while docs:  # srcdoc documents resolve against the page URL too
+        doc = docs.pop()
+        docs += [htmllib.unescape(next(g for g in m.groups() if g is not None))
+                 for m in SRCDOC_RE.finditer(doc)]
+        urls |= _refs(NAV_LINK_RE.sub("", SRCDOC_RE.sub("", doc)), page_url, origin)
+    return sorted(urls)
+
+
+def _refs(html: str, base_url: str, origin: str) -> set[str]:
+    return _resolve([next(g for g in m.groups() if g) for m in ASSET_RE.finditer(html)],
+                    base_url, origin)
+
+
+def _resolve(refs, base_url: str, origin: str) -> set[str]:
+    urls = set()
+    for ref in refs:
+        if ref.startswith(("data:", "javascript:", "mailto:")):
+            continue
+        url = urldefrag(urljoin(base_url, ref)).url
+        if urlparse(url).netloc == origin and url != base_url:
+            urls.add(url)
+    return urls
+
+
+class PdfCache:
+    def __init__(self, root=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._assets = {}  # url -> (digest, paths) task, shared by every page of the run
+        self._salts = {}
+        self.fetch = _fetch  # url -> bytes; swapped for StaticSite.read with --site
+
+    def _salt(self, source: str) -> str:
+        # The section script plus every shared render module
+        if source not in self._salts:
+            here = Path(__file__).resolve().parent
+            h = hashlib.sha256()
+            for name in [source, *(str(here / m) for m in RENDER_MODULES)]:
+                try:
+                    data = Path(name).read_bytes()
+                except OSError:
+                    data = name.encode()
+                h.update(hashlib.sha256(data).digest())
+            self._salts[source] = h.hexdigest()
+        return self._salts[source]
+
+    async def _asset(self, url: str) -> tuple[str, tuple]:
+        # Digest of `url` and, for scripts and styles, the paths its body names
+        if url not in self._assets:
+            async def read():
+                try:
+                    data = await asyncio.to_thread(self.fetch, url)
+                except Exception:
+                    return "missing", ()
+                paths = ()
+                if urlparse(url).path.lower().endswith(SCANNED):
+                    text = data.decode("utf-8", "replace")
+                    paths = tuple(next(g for g in m.groups() if g) for m in BODY_RE.finditer(text))
+                return hashlib.sha256(data).hexdigest(), paths
+            self._assets[url] = asyncio.ensure_future(read())
+        return await self._assets[url]
+
+    async def _asset_digests(self, html: str, url: str, extra=()) -> dict:
+        # url -> digest for the page's assets, `extra` ones and everything
+        # they load
+        origin = urlparse(url).netloc
+        digests = {}
+        todo = sorted(set(asset_urls(html, url)) | set(extra))
+        while todo:
+            found = await asyncio.gather(*(self._asset(a) for a in todo))
+            more = set()
+            for a, (digest, paths) in zip(todo, found):
+                digests[a] = digest
+                # CSS url()s resolve against the stylesheet, script paths
+                # (loadImage, fetch) against the document
+                base = a if urlparse(a).path.lower().endswith(".css") else url
+                more |= _resolve(paths, base, origin)
+            todo = sorted(more - digests.keys() - {url})
+        return digests
+
+    async def key(self, url: str, source: str = "", variant: str = "", assets=()) -> str:
+        # `assets`: URLs the page may load under names no scan can see, e.g.
+        # images picked by a sketch at run time (a section's ASSETS)
+        html = await asyncio.to_thread(self.fetch, url)
+        digests = await self._asset_digests(html.decode("utf-8", "replace"), url, assets)
+        h = hashlib.sha256()
+        h.update(f"{CACHE_VERSION}\0{self._salt(source)}\0{variant}\0{url}\0".encode())
+        h.update(html)
+        for a in sorted(digests):
+            h.update(f"\0{a}={digests[a]}".encode())
+        return h.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.pdf"
+
+    def get(self, key: str) -> bytes | None:
+        entry = self._path(key)
+        try:
+            data = entry.read_bytes()
+        except OSError:
+            self.misses += 1
+            return None
+        os.utime(entry)  # mark as recently used
+        self.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes):
+        if not data:
+            return
+        self.root.mkdir(exist_ok=True)
+        tmp = self._path(key).with_suffix(".part")
+        tmp.write_bytes(data)
+        os.replace(tmp, self._path(key))
+        self.evict()
+
+    def evict(self):
+        entries = sorted(self.root.glob("*.pdf"), key=lambda f: f.stat().st_mtime)
+        total = sum(f.stat().st_size for f in entries)
+        for f in entries:
+            if total <= self.max_bytes:
+                break
+            total -= f.stat().st_size
+            f.unlink()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# Size optimization for merged section PDFs.
+#
+# Every per-page PDF carries its own copy of the theme fonts and of repeated
+# images (mandrill.png, the p*.jpg set, ...). optimize() hashes every stream
+# (raw data plus its dictionary), points all references at one copy per hash
+# and drops the rest; SAVE_OPTIONS then recompresses streams at the highest
+# flate level and packs objects into object streams.
+
+import hashlib
+from pikepdf import Array, Dictionary, ObjectStreamMode, Pdf, Stream
+import pikepdf
+
+# ===== CONFIG =====
+OPTIMIZE = True
+FLATE_LEVEL = 9
+# ===================
+
+SAVE_OPTIONS = {
+    "compress_streams": True,
+    "recompress_flate": True,
+    "object_stream_mode": ObjectStreamMode.generate,
+}
+
+
+def _token(value) -> bytes:
+    if isinstance(value, pikepdf.Object):
+        return value.unparse()
+    return repr(value).encode()
+
+
+def _stream_digest(stream: Stream) -> str:
+    h = hashlib.sha256()
+    for key in sorted(stream.stream_dict.keys()):
+        if key != "/Length":
+            h.update(key.encode() + b"=" + _token(stream.stream_dict[key]) + b"\0")
+    h.update(stream.read_raw_bytes())
+    return h.hexdigest()
+
+
+def _roots(pdf: Pdf):
+    # Top-level containers: every indirect object, plus the trailer
+    for obj in pdf.objects:
+        if isinstance(obj, Stream):
+            yield obj.stream_dict
+        elif isinstance(obj, (Dictionary, Array)):
+            yield obj
+    yield pdf.trailer
+
+
+def _rewrite(container, replace: dict):
+    # Repoint references to duplicates, descending into direct children
+    keys = range(len(container)) if isinstance(container, Array) else list(container.keys())
+    for key in keys:
+        value = container[key]
+        if not isinstance(value, pikepdf.Object):
+            continue
+        if value.is_indirect:
+            if value.objgen in replace:
+                container[key] = replace[value.objgen]
+        elif isinstance(value, (Dictionary, Array)):
+            _rewrite(value, replace)
+
+
+def dedupe_streams(pdf: Pdf) -> int:
+    # Returns how many duplicate streams were collapsed
+    keep = {}      # digest -> first stream
+    replace = {}   # objgen of a duplicate -> the stream kept
+    for obj in pdf.objects:
+        if isinstance(obj, Stream) and obj.is_indirect:
+            first = keep.setdefault(_stream_digest(obj), obj)
+            if first.objgen != obj.objgen:
+                replace[obj.objgen] = first
+    if not replace:
+        return 0
+    for container in _roots(pdf):
+        _rewrite(container, replace)
+    return len(replace)
+
+
+def optimize(pdf: Pdf) -> int:
+    # Unreferenced duplicates are dropped by save(), which only writes
+    # objects reachable from the trailer
+    pikepdf.settings.set_flate_compression_level(FLATE_LEVEL)
+    collapsed = dedupe_streams(pdf)
+    pdf.remove_unreferenced_resources()
+    return collapsed
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# Block requests the print doesn't need, and record what finished last.
+#
+# Installed on every context (a BrowserPool hook, registered last so it runs
+# before the asset cache and --site routes). Requests whose resource type is
+# in BLOCK_TYPES or whose URL matches a DENY pattern are aborted unless an
+# ALLOW pattern matches: hugo server's live-reload, the Book theme's search
+# index, analytics and remote fonts would otherwise keep "networkidle" from
+# settling. The last requests to finish on each page go to the build report.
+
+import re
+import time
+
+from build_report import current_timing
+
+# ===== CONFIG =====
+BLOCK_TYPES = {"websocket", "eventsource", "manifest", "beacon", "ping"}
+DENY = [
+    r"/livereload\.js",                                  # hugo server
+    r"search-data|/[a-z]{2}\.search\.min\.|flexsearch",  # Book theme search
+    r"google-analytics\.com|googletagmanager\.com|plausible\.io|/gtag/",
+    r"fonts\.googleapis\.com|fonts\.gstatic\.com|use\.typekit\.net",
+]
+ALLOW = []  # patterns that win over DENY
+# ===================
+
+_deny = re.compile("|".join(DENY)) if DENY else None
+_allow = re.compile("|".join(ALLOW)) if ALLOW else None
+
+
+def blocked(url: str, resource_type: str) -> bool:
+    if _allow and _allow.search(url):
+        return False
+    return resource_type in BLOCK_TYPES or bool(_deny and _deny.search(url))
+
+
+class _Tracker:
+    # Start/end of every request of one context, charged to its page
+    def __init__(self, timing):
+        self.timing = timing
+        self.started = {}
+
+    def start(self, request):
+        self.started[request] = time.perf_counter()
+
+    def end(self, request, failed=False):
+        start = self.started.pop(request, None)
+        if start is not None:
+            self.timing.finish_request(request.url, start, time.perf_counter(), failed)
+
+
+async def install(ctx):
+    # BrowserPool hook; keep it last so it sees requests before other routes.
+    # Runs inside the page task, so this is the page's timing (routes and
+    # events are dispatched from elsewhere)
+    timing = current_timing()
+
+    async def handle(route):
+        request = route.request
+        if blocked(request.url, request.resource_type):
+            if timing is not None:
+                timing.blocked += 1
+            await route.abort("blockedbyclient")
+        else:
+            await route.fallback()
+
+    await ctx.route("**/*", handle)
+    if timing is not None:
+        tracker = _Tracker(timing)
+        ctx.on("request", tracker.start)
+        ctx.on("requestfinished", tracker.end)
+        ctx.on("requestfailed", lambda r: tracker.end(r, failed=True))
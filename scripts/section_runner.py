@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+# Shared render pipeline, page scheduling and merging for the build_*_pdf.py
+# section scripts, which only hold their configuration (BASE, PATHS, OUT,
+# ASSETS and an optional PAGE_CONFIG) and call run(__name__).
+#
+# render_to_pdf() loads one doc page and prints it: static pages (see
+# page_kind.py) with scripts off and no waits; dynamic ones after network
+# idle, lazy content, images and settled sketches (or a virtual-time budget),
+# with canvases printed as still images (see canvas_snapshot.py).
+# Pages of a section are rendered concurrently (bounded by a semaphore, one
+# context per page) straight to memory, while the merged PDF always follows
+# PATHS order. Each render gets a hard deadline; a page that fails or hangs
+# goes back to the end of the queue (REQUEUE times) before it is given up.
+# With --forensics DIR, pages over their budget are rendered once more under
+# a trace (see page_forensics.py).
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import NamedTuple
+from pikepdf import Pdf
+from playwright.async_api import async_playwright, TimeoutError as PWTimeout
+
+from asset_cache import AssetCache
+from browser_pool import BrowserPool
+from build_report import PageTiming, add_report_argument, phase, timed, track, write_report
+from canvas_snapshot import SNAPSHOT, add_snapshot_argument, snapshot_canvases
+from lazy_content import install as install_lazy_content, reveal as reveal_lazy_content
+from page_forensics import (
+    PAGE_BUDGET_S, add_forensics_arguments, capture, install as install_forensics,
+)
+from page_kind import classify
+from pdf_cache import PdfCache
+from pdf_optimize import OPTIMIZE, SAVE_OPTIONS, optimize as optimize_pdf
+from request_filter import install as install_request_filter
+from sketch_ready import (
+    SETTLE_FRAMES, SETTLE_TIMEOUT_MS, install as install_sketch_ready, wait_sketches,
+)
+from static_site import StaticSite, add_site_argument
+from virtual_time import add_virtual_time_argument, frames_to_ms, goto_virtual
+
+# ===== CONFIG =====
+JOBS = 1
+CONTEXTS_PER_BROWSER = 4  # swiftshader GL is shared per browser; spread the load
+PAGE_DEADLINE_S = 240  # whole render of one page, retries included
+REQUEUE = 1  # extra attempts for a page that failed or hit the deadline
+
+VIEWPORT = {"width": 1600, "height": 2400}
+NAV_TIMEOUT_MS = 45000
+IMAGES_TIMEOUT_MS = 15000
+PRINT_MARGIN = {"top": "14mm", "right": "14mm", "bottom": "14mm", "left": "14mm"}
+PRINT_CSS = """
+  @media print {
+    h1, h2, h3, table { page-break-inside: avoid; break-inside: avoid; }
+    pre, code { overflow-wrap: anywhere; }
+  }
+"""
+
+LAUNCH_ARGS = [
+    "--disable-gpu",
+    "--disable-vulkan",
+    "--use-gl=swiftshader",
+    "--use-angle=swiftshader",
+    "--enable-unsafe-swiftshader",
+    "--hide-scrollbars",
+    "--font-render-hinting=medium",
+    "--run-all-compositor-stages-before-draw",
+]
+# ===================
+
+
+class PageConfig(NamedTuple):
+    # How render_to_pdf loads and prints a page; a section script may set
+    # PAGE_CONFIG = PageConfig(...) to override the defaults
+    viewport: dict = VIEWPORT
+    nav_timeout_ms: int = NAV_TIMEOUT_MS
+    images_timeout_ms: int = IMAGES_TIMEOUT_MS
+    print_margin: dict = PRINT_MARGIN
+    frames: int = SETTLE_FRAMES  # each sketch draws this many before printing
+    settle_timeout_ms: int = SETTLE_TIMEOUT_MS
+    classify: bool = True  # False: every page takes the dynamic path
+    virtual_time: int = 0
+    snapshot: str = SNAPSHOT
+
+
+def parse_args(description=None):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--jobs", "-j", type=int, default=JOBS,
+                        help=f"pages rendered at once (default: {JOBS})")
+    add_cache_argument(parser)
+    add_virtual_time_argument(parser)
+    add_site_argument(parser)
+    add_report_argument(parser)
+    add_snapshot_argument(parser)
+    add_forensics_arguments(parser)
+    return parser.parse_args()
+
+
+def add_cache_argument(parser):
+    parser.add_argument("--no-cache", dest="cache", action="store_false",
+                        help="re-render every page, ignoring the page cache")
+
+
+_cache = None
+
+
+def page_cache() -> PdfCache:
+    # One cache per process so asset digests are computed once per run
+    global _cache
+    if _cache is None:
+        _cache = PdfCache()
+    return _cache
+
+
+_assets = None
+
+
+def asset_cache() -> AssetCache:
+    # Shared by every context (and section) of the run
+    global _assets
+    if _assets is None:
+        _assets = AssetCache()
+    return _assets
+
+
+def pool_options(site, base: str) -> dict:
+    # BrowserPool hooks for a run: slow-page capture, the shared asset cache,
+    # with --site DIR `base` served from disk (the page cache then reads the
+    # same files instead of fetching them over HTTP), and the request filter.
+    # Routes run last-registered first, so the filter sees every request
+    # before the rest. The site is let go when the pool closes.
+    hooks, on_close = [install_forensics, asset_cache().install], []
+    if site:
+        static = StaticSite(site, base)
+        page_cache().fetch = static.read
+        print(f"📂 Sirviendo {static.root} ({len(static.files)} archivos) en {static.origin}{static.prefix}")
+        hooks.append(static.install)
+        on_close.append(static.close)
+    hooks.append(install_request_filter)
+    return {"hooks": hooks, "on_close": on_close}
+
+
+async def is_static_page(url: str) -> bool:
+    # Reads the HTML the same way the page cache does (HTTP or --site)
+    return await classify(url, page_cache().fetch)
+
+
+def pool_size(jobs: int) -> int:
+    return max(1, -(-jobs // CONTEXTS_PER_BROWSER))
+
+
+def index_path(out) -> Path:
+    # Sidecar listing where each doc page landed in a section PDF
+    out = Path(out)
+    return out.with_name(out.stem + ".index.json")
+
+
+def write_index(out, pages: list):
+    target = index_path(out)
+    part = target.with_name(target.name + ".part")
+    part.write_text(json.dumps({"out": Path(out).name, "pages": pages}, indent=1),
+                    encoding="utf-8")
+    os.replace(part, target)
+
+
+def read_index(out) -> list | None:
+    try:
+        return json.loads(index_path(out).read_text(encoding="utf-8"))["pages"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+class SectionMerger:
+    # One open output document; page PDFs are appended in PATHS order as soon
+    # as every earlier page has arrived, so nothing is written per page.
+
+    def __init__(self):
+        self.pdf = Pdf.new()
+        self.rendered = 0
+        self.missing = 0
+        self._next = 0
+        self._pending = {}
+        self._sources = []  # kept open until save: pages reference their streams
+        self.timings = []  # PageTiming per page, in PATHS order
+        self.save_seconds = 0.0
+        self.optimize_seconds = 0.0
+        self.duplicates = 0  # streams collapsed by the optimizer
+        self.index = []  # {"path", "first", "count"} per page, in PATHS order
+
+    def add(self, i: int, rel_path: str, data, timing=None):
+        self._pending[i] = (rel_path, data, timing)
+        while self._next in self._pending:
+            rel_path, data, timing = self._pending.pop(self._next)
+            self._next += 1
+            self.timings.append(timing)
+            if not data:
+                if data is not None:  # None: the error was already reported
+                    print(f"⚠️  Saltando {rel_path} (vacío)")
+                self.skip(rel_path)
+                continue
+            with phase("merge", timing):
+                src = Pdf.open(io.BytesIO(data))
+                self._sources.append(src)
+                self.append(rel_path, src.pages)
+            if timing:
+                timing.bytes, timing.pages = len(data), len(src.pages)
+
+    def append(self, rel_path: str, pages):
+        # Next doc page, already rendered (pages of an open Pdf)
+        first = len(self.pdf.pages)
+        self.pdf.pages.extend(pages)
+        self.index.append({"path": rel_path, "first": first, "count": len(self.pdf.pages) - first})
+        self.rendered += 1
+
+    def skip(self, rel_path: str):
+        self.index.append({"path": rel_path, "first": len(self.pdf.pages), "count": 0})
+        self.missing += 1
+
+    def close(self):
+        # Release the page PDFs the merged document was built from
+        for src in self._sources:
+            src.close()
+        self._sources = []
+
+    def save(self, out: Path, optimize: bool = OPTIMIZE):
+        start = time.perf_counter()
+        if optimize:
+            self.duplicates = optimize_pdf(self.pdf)
+            self.optimize_seconds = time.perf_counter() - start
+        part = out.with_name(out.name + ".part")
+        with open(part, "wb") as f:
+            self.pdf.save(f, **(SAVE_OPTIONS if optimize else {}))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(part, out)
+        write_index(out, self.index)
+        self.close()
+        self.save_seconds = time.perf_counter() - start
+        print(f"✅ Listo: {out}")
+
+
+async def render_section(paths, render, jobs: int = JOBS, sem=None, base: str = "",
+                         keep_going: bool = True, cache: bool = True, variant: str = "",
+                         only=None, journal=None, deadline: float = PAGE_DEADLINE_S,
+                         requeue: int = REQUEUE, forensics=None,
+                         page_budget: float = PAGE_BUDGET_S, source: str = "", assets=()):
+    # render(rel_path) returns the page PDF bytes, or (bytes, cacheable) to keep
+    # a doubtful page out of the cache; failures are requeued, then reported
+    # and skipped, or abort the whole section when keep_going is off. `variant`
+    # tells render modes apart in the cache.
+    # Pass a shared `sem` to schedule several sections on the same workers,
+    # and `only` (a set of paths) to render just part of the section.
+    # Finished pages are checkpointed to `journal` (and taken from it on resume).
+    # Pages rendered in more than `page_budget` seconds are traced into the
+    # `forensics` directory, when given. `source` (default: the file `render`
+    # comes from) salts the page cache keys, and `assets` (site paths, like a
+    # section's ASSETS) are hashed into every one of them.
+    if only is not None:
+        paths = [p for p in paths if p in only]
+    sem = sem or asyncio.Semaphore(max(1, jobs))
+    keys = page_cache()  # content keys also vouch for journaled pages with the cache off
+    cache = keys if cache else None
+    source = source or getattr(getattr(render, "__code__", None), "co_filename", "")
+    merged = SectionMerger()
+
+    async def cache_key(p):
+        try:
+            return await keys.key(f"{base}{p}", source, variant,
+                                   [f"{base}{a}" for a in assets])
+        except Exception as e:
+            print(f"⚠️  Sin caché para {p}: {e}")
+            return None
+
+    async def attempt(i, p, timing):
+        with phase("cache_key"):
+            key = await cache_key(p) if cache or journal is not None else None
+        data = cache.get(key) if cache and key else None
+        if not data and journal is not None:
+            data = journal.get(f"{base}{p}", key)
+        resumed = journal is not None and bool(data) and journal.done(f"{base}{p}", key)
+        if data:
+            timing.cached = True
+            print(f"[{i + 1:02d}] {base}{p} ({'reanudado' if resumed else 'caché'})")
+            return data
+        print(f"[{i + 1:02d}] {base}{p}")
+        try:
+            data = await asyncio.wait_for(render(p), deadline)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"sin terminar tras {deadline:.0f}s") from None
+        cacheable = True
+        if isinstance(data, tuple):
+            data, cacheable = data
+        if cache and key and cacheable:
+            cache.put(key, data)
+        if journal is not None and key and data and cacheable:  # doubtful pages render again
+            # Off the event loop; only a pointer when the cache holds the bytes
+            await asyncio.to_thread(journal.record, f"{base}{p}", key,
+                                    None if cache else data)
+        return data
+
+    async def one(i, p):
+        timing = None
+        data = None
+        for n in range(1, requeue + 2):
+            # Every attempt waits its turn again, behind the pages queued since
+            async with sem:
+                timing = timing or PageTiming(p)
+                timing.attempts = n
+                track(timing)  # this task's phases land on `timing`
+                try:
+                    data = await attempt(i, p, timing)
+                    timing.error = None
+                    break
+                except Exception as e:
+                    timing.error = str(e)
+                    if n <= requeue:
+                        print(f"🔁 {p}: {e}. Reencolada")
+                        continue
+                    if not keep_going:
+                        raise
+                    print(f"⚠️  Error en {p}: {e}. Continuo…")
+                    data = None
+        timing.finish()
+        merged.add(i, p, data, timing)
+        if forensics and not timing.cached and timing.total > page_budget:
+            async with sem:
+                try:
+                    await asyncio.wait_for(capture(forensics, p, render, timing, page_budget),
+                                           deadline)
+                except asyncio.TimeoutError:
+                    print(f"⚠️  {p}: captura cortada tras {deadline:.0f}s")
+
+    tasks = [asyncio.ensure_future(one(i, p)) for i, p in enumerate(paths)]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    return merged
+
+
+async def wait_images(page, timeout: int = IMAGES_TIMEOUT_MS):
+    try:
+        await page.wait_for_function(
+            """
+            async () => {
+              const imgs = Array.from(document.images || []);
+              if (imgs.length === 0) return true;
+              await Promise.all(imgs.map(img => img.decode?.().catch(()=>{})));
+              return imgs.every(img => img.complete);
+            }
+            """,
+            timeout=timeout
+        )
+    except PWTimeout:
+        pass
+
+
+async def print_page(pool, base: str, rel_path: str, cfg: PageConfig = PageConfig()):
+    # Returns (pdf bytes, (size, blank size) of each canvas snapshot)
+    url = f"{base}{rel_path}"
+    static = (cfg.classify and not cfg.virtual_time
+              and await timed("classify", is_static_page(url)))
+    async with pool.context(viewport=cfg.viewport, java_script_enabled=not static) as ctx:
+        if not static:
+            await install_sketch_ready(ctx)
+            await install_lazy_content(ctx)
+        page = await ctx.new_page()
+
+        await page.emulate_media(media="print")
+        if static:
+            # No sketches: scripts off and nothing to wait for
+            await timed("goto", page.goto(url, wait_until="load", timeout=cfg.nav_timeout_ms))
+        elif cfg.virtual_time:
+            # Budget covers at least the settle frames at 60 fps
+            budget = max(cfg.virtual_time, frames_to_ms(cfg.frames))
+            await timed("virtual_time", goto_virtual(ctx, page, url, budget, cfg.nav_timeout_ms))
+        else:
+            await timed("goto", page.goto(url, wait_until="networkidle",
+                                          timeout=cfg.nav_timeout_ms))
+            await timed("lazy", reveal_lazy_content(page))
+            await timed("images", wait_images(page, cfg.images_timeout_ms))
+            await timed("sketches", wait_sketches(page, cfg.frames, cfg.settle_timeout_ms))
+
+        await page.add_style_tag(content=PRINT_CSS)
+        sizes = [] if static else await timed("snapshot", snapshot_canvases(page, cfg.snapshot))
+
+        data = await timed("pdf", page.pdf(
+            print_background=True,
+            display_header_footer=False,
+            prefer_css_page_size=True,
+            margin=cfg.print_margin,
+            scale=1.0
+        ))
+        return data, sizes
+
+
+async def render_to_pdf(pool, base: str, rel_path: str, cfg: PageConfig = PageConfig()) -> bytes:
+    data, _ = await print_page(pool, base, rel_path, cfg)
+    return data
+
+
+def page_config(section, virtual_time: int = 0, snapshot: str = SNAPSHOT) -> PageConfig:
+    return getattr(section, "PAGE_CONFIG", PageConfig())._replace(
+        virtual_time=virtual_time, snapshot=snapshot)
+
+
+async def prefetch_assets(pool, section):
+    # Heavy images go into the run's shared asset cache before any page asks
+    assets = getattr(section, "ASSETS", [])
+    if assets:
+        async with pool.context(viewport=page_config(section).viewport) as ctx:
+            await asset_cache().prefetch(ctx, [f"{section.BASE}{a}" for a in assets])
+
+
+async def section_pages(section, pool, virtual_time: int = 0, snapshot: str = SNAPSHOT, **opts):
+    # Render a section script's pages (opts go to render_section). Scripts with
+    # a pipeline of their own define render_pages(pool, virtual_time, snapshot, **opts)
+    if hasattr(section, "render_pages"):
+        return await section.render_pages(pool, virtual_time=virtual_time, snapshot=snapshot,
+                                          **opts)
+    cfg = page_config(section, virtual_time, snapshot)
+    await prefetch_assets(pool, section)
+    return await render_section(
+        section.PATHS, lambda p: render_to_pdf(pool, section.BASE, p, cfg),
+        base=section.BASE, variant=f"vt={virtual_time},snap={snapshot}",
+        source=section.__file__, assets=getattr(section, "ASSETS", ()), **opts
+    )
+
+
+async def main(section, jobs: int = JOBS, site=None, report=None, **opts):
+    start = time.perf_counter()
+    async with async_playwright() as play:
+        async with BrowserPool(play, args=LAUNCH_ARGS, size=pool_size(jobs),
+                               **pool_options(site, section.BASE)) as pool:
+            merged = await section_pages(section, pool, jobs=jobs, **opts)
+
+    merged.save(Path(section.OUT))
+    if report:
+        write_report(report, {Path(section.OUT).stem: (merged, section.OUT)},
+                     time.perf_counter() - start, pool)
+
+
+def run(module_name: str):
+    # `python build_<section>_pdf.py [options]`
+    asyncio.run(main(sys.modules[module_name], **vars(parse_args())))
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# Sharded builds: split every doc page across workers, then merge in order.
+#
+# The combined manifest is every section's PATHS in build_all_pdfs order.
+# `build_all_pdfs.py --shard I/N` renders entries I-1, I-1+N, I-1+2N, ... (so
+# the heavy visual_algorithms pages are spread over all workers) into
+# shards/I-of-N/, next to a shard.json naming the pages it holds. Running
+# this module merges all N shard directories back into the section PDFs, in
+# manifest order, and refuses to write them while any page is missing.
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+from pikepdf import Pdf
+
+from section_runner import SectionMerger, read_index
+
+# ===== CONFIG =====
+SHARD_DIR = "shards"
+# ===================
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    # "I/N" with 1 <= I <= N
+    try:
+        i, n = (int(x) for x in spec.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"shard no válido: {spec!r} (usa I/N)")
+    if not 1 <= i <= n:
+        raise argparse.ArgumentTypeError(f"shard fuera de rango: {spec!r}")
+    return i, n
+
+
+def add_shard_arguments(parser):
+    parser.add_argument("--shard", type=parse_shard, metavar="I/N",
+                        help="render only shard I of N of the combined page manifest")
+    parser.add_argument("--shard-dir", default=SHARD_DIR, metavar="DIR",
+                        help=f"where shard outputs go (default: {SHARD_DIR})")
+
+
+def combined_manifest(sections: dict) -> list[tuple[str, str]]:
+    # (section, path) for every doc page, in build order
+    return [(name, path) for name, mod in sections.items() for path in mod.PATHS]
+
+
+def manifest_digest(manifest) -> str:
+    return hashlib.sha256(json.dumps(manifest).encode()).hexdigest()[:16]
+
+
+def shard_pages(manifest, i: int, n: int) -> dict:
+    # section -> set of paths owned by shard i of n
+    owned = {}
+    for k, (name, path) in enumerate(manifest):
+        if k % n == i - 1:
+            owned.setdefault(name, set()).add(path)
+    return owned
+
+
+def shard_dir(root, i: int, n: int) -> Path:
+    return Path(root) / f"{i}-of-{n}"
+
+
+def write_shard_index(root, i: int, n: int, manifest, sections: dict):
+    # sections: name -> output file written by this shard
+    folder = shard_dir(root, i, n)
+    target = folder / "shard.json"
+    part = target.with_name(target.name + ".part")
+    part.write_text(json.dumps({
+        "shard": i,
+        "of": n,
+        "manifest": manifest_digest(manifest),
+        "sections": {name: Path(out).name for name, out in sections.items()},
+    }, indent=1), encoding="utf-8")
+    os.replace(part, target)
+
+
+def _load_shards(root, manifest) -> tuple[int, list[dict]]:
+    shards = []
+    for f in sorted(Path(root).glob("*-of-*/shard.json")):
+        info = json.loads(f.read_text(encoding="utf-8"))
+        info["dir"] = f.parent
+        shards.append(info)
+    if not shards:
+        raise SystemExit(f"❌ No hay shards en {root}")
+    n = shards[0]["of"]
+    if any(s["of"] != n for s in shards):
+        raise SystemExit("❌ Los shards no tienen el mismo N")
+    if any(s["manifest"] != manifest_digest(manifest) for s in shards):
+        raise SystemExit("❌ El manifiesto cambió desde que se generaron los shards")
+    found = {s["shard"] for s in shards}
+    absent = sorted(set(range(1, n + 1)) - found)
+    if absent:
+        raise SystemExit(f"❌ Faltan shards: {', '.join(f'{i}/{n}' for i in absent)}")
+    return n, sorted(shards, key=lambda s: s["shard"])
+
+
+def merge(sections: dict, root=SHARD_DIR, allow_missing: bool = False) -> bool:
+    manifest = combined_manifest(sections)
+    n, shards = _load_shards(root, manifest)
+    opened = {}  # (shard, section) -> (Pdf, {path: index entry})
+
+    def lookup(k, name, path):
+        shard = shards[k % n]
+        key = (shard["shard"], name)
+        if key not in opened:
+            out = shard["sections"].get(name)
+            pdf_path = shard["dir"] / out if out else None
+            if pdf_path is None or not pdf_path.exists():
+                opened[key] = (None, {})
+            else:
+                index = read_index(pdf_path) or []
+                opened[key] = (Pdf.open(pdf_path), {e["path"]: e for e in index})
+        src, index = opened[key]
+        entry = index.get(path)
+        if src is None or not entry or not entry["count"]:
+            return None
+        return src.pages[entry["first"]:entry["first"] + entry["count"]]
+
+    try:
+        positions = {entry: k for k, entry in enumerate(manifest)}
+        plans = {}
+        missing = []
+        for name, mod in sections.items():
+            plans[name] = []
+            for path in mod.PATHS:
+                pages = lookup(positions[(name, path)], name, path)
+                if pages is None:
+                    missing.append(f"{name}: {path}")
+                plans[name].append((path, pages))
+        if missing:
+            print(f"⚠️  {len(missing)} página(s) sin renderizar:")
+            for m in missing:
+                print(f"   - {m}")
+            if not allow_missing:
+                print("❌ Merge cancelado.")
+                return False
+
+        for name, mod in sections.items():
+            merged = SectionMerger()
+            for path, pages in plans[name]:
+                if pages is None:
+                    merged.skip(path)
+                else:
+                    merged.append(path, pages)
+            merged.save(Path(mod.OUT))
+    finally:
+        for src, _ in opened.values():
+            if src is not None:
+                src.close()
+    return not missing
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Merge shard outputs into the section PDFs")
+    parser.add_argument("--shard-dir", default=SHARD_DIR, metavar="DIR",
+                        help=f"directory holding the I-of-N shard folders (default: {SHARD_DIR})")
+    parser.add_argument("--allow-missing", action="store_true",
+                        help="write the section PDFs even if some pages are missing")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    from build_all_pdfs import SECTIONS
+    args = parse_args()
+    sys.exit(0 if merge(SECTIONS, args.shard_dir, args.allow_missing) else 1)
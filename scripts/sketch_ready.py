@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# Event-driven "sketch settled" signal for p5 pages.
+#
+# SKETCH_READY_JS is installed as a context init script (so it also runs in
+# every iframe). It hooks p5 as soon as the library defines `window.p5`:
+# instances are tracked through the init/presetup lifecycle, pending
+# loadImage calls are counted, and waiters are re-checked after every draw.
+# The renderer then awaits window.__sketchesSettled(frames) instead of
+# sleeping a fixed amount of time.
+#
+# While a page waits on the network or on other frames, its sketches would
+# keep drawing at full rate on software GL and steal CPU from every other
+# page in the pool. So a sketch stops looping once a settle wait on its
+# document resolves (the print only needs the settled frame), and in any
+# case after THROTTLE_AFTER_FRAMES; THROTTLE_FPS optionally caps the rate
+# before that. Virtual-time renders turn throttling off (THROTTLE_OFF_JS):
+# there the budget, not the frame count, decides when drawing ends.
+
+import asyncio
+import json
+
+# ===== CONFIG =====
+SETTLE_FRAMES = 3
+SETTLE_TIMEOUT_MS = 18000
+THROTTLE_AFTER_FRAMES = 120  # noLoop() after this many frames; 0 = never.
+                             # Keep >= the largest settle budget asked for
+THROTTLE_FPS = 0             # cap frameRate until then; 0 = sketch's own
+STOP_WHEN_SETTLED = True     # noLoop() every sketch once a settle wait resolves
+# ===================
+
+THROTTLE_JS = "window.__sketchThrottle = %s" % json.dumps({
+    "after": THROTTLE_AFTER_FRAMES,
+    "fps": THROTTLE_FPS,
+    "settled": STOP_WHEN_SETTLED,
+})
+THROTTLE_OFF_JS = "window.__sketchThrottle = null"
+
+SKETCH_READY_JS = """
+(() => {
+  if (window.__sketchesSettled) return
+  const instances = new Set()
+  let pending = 0
+  let waiters = []
+  const notify = () => { waiters = waiters.filter(w => !w()) }
+
+  const drawFn = p => (p._isGlobal ? window.draw : p.draw)
+  const canvasOf = p => p.canvas || p._renderer?.canvas || p._renderer?.elt
+  const looping = p => (typeof p.isLooping === 'function' ? p.isLooping() : p._loop !== false)
+  const settled = (p, frames) => {
+    if (pending > 0 || p._setupDone === false) return false
+    if (typeof drawFn(p) !== 'function') return true
+    return p.frameCount >= frames || (!looping(p) && p.frameCount >= 1)
+  }
+  const sized = c => (c.width | 0) > 0 && (c.height | 0) > 0
+
+  function track() { instances.add(this); notify() }
+  // Read at draw time, so a later init script can still switch it off
+  const throttle = () => window.__sketchThrottle || {}
+  const targetRate = p =>
+    (typeof p.getTargetFrameRate === 'function' ? p.getTargetFrameRate() : p._targetFrameRate)
+  const stop = p => { if (looping(p) && typeof p.noLoop === 'function') p.noLoop() }
+
+  function drew() {
+    const t = throttle()
+    if (t.fps && targetRate(this) > t.fps) this.frameRate(t.fps)
+    if (t.after && this.frameCount >= t.after) stop(this)
+    notify()
+  }
+
+  function patch(p5) {
+    if (!p5 || !p5.prototype || p5.__sketchReady) return
+    p5.__sketchReady = true
+    if (typeof p5.registerAddon === 'function') {
+      // p5 2.x lifecycles
+      p5.registerAddon((_, fn, lifecycles) => {
+        lifecycles.presetup = track
+        lifecycles.postdraw = drew
+      })
+    } else if (typeof p5.prototype.registerMethod === 'function') {
+      // p5 1.x hooks
+      p5.prototype.registerMethod('init', track)
+      p5.prototype.registerMethod('post', drew)
+    }
+    const load = p5.prototype.loadImage
+    if (typeof load === 'function') {
+      p5.prototype.loadImage = function (path, ok, err, ...rest) {
+        pending++
+        let done = false
+        const finish = () => { if (!done) { done = true; pending--; notify() } }
+        const res = load.call(
+          this, path,
+          (...a) => { finish(); return ok?.(...a) },
+          (...a) => { finish(); return err?.(...a) },
+          ...rest
+        )
+        if (res && typeof res.then === 'function') res.then(finish, finish)
+        return res
+      }
+    }
+  }
+
+  let current = window.p5
+  patch(current)
+  try {
+    Object.defineProperty(window, 'p5', {
+      configurable: true,
+      get: () => current,
+      set: v => { current = v; patch(v) },
+    })
+  } catch (e) {}
+
+  // Resolve once check() passes; re-checked after every p5 draw and, for
+  // plain canvases that don't draw through p5, on animation frames
+  const whenTrue = check => new Promise(resolve => {
+    const run = () => { patch(window.p5); const ok = check(); if (ok) resolve(true); return ok }
+    if (run()) return
+    waiters.push(run)
+    const tick = () => { if (waiters.includes(run)) { notify(); requestAnimationFrame(tick) } }
+    requestAnimationFrame(tick)
+  })
+
+  // Live p5 instances of this document (used to stop loops before printing)
+  window.__sketchInstances = () => [...instances]
+
+  // Settled promise for one canvas (p5-owned or plain)
+  window.__sketchSettled = (canvas, frames = 1) => whenTrue(() => {
+    const owner = [...instances].find(p => canvasOf(p) === canvas)
+    return sized(canvas) && (!owner || settled(owner, frames))
+  })
+
+  // Settled promise for every canvas and sketch in this document
+  window.__sketchesSettled = (frames = 1) => whenTrue(() =>
+    [...instances].every(p => settled(p, frames)) &&
+    [...document.querySelectorAll('canvas')].every(sized)
+  ).then(ok => {
+    if (throttle().settled) instances.forEach(stop)
+    return ok
+  })
+})()
+"""
+
+
+async def install(ctx):
+    await ctx.add_init_script(THROTTLE_JS)
+    await ctx.add_init_script(SKETCH_READY_JS)
+
+
+async def wait_frame(frame, frames: int = SETTLE_FRAMES, timeout: int = SETTLE_TIMEOUT_MS) -> bool:
+    try:
+        await asyncio.wait_for(
+            frame.evaluate(
+                "f => window.__sketchesSettled ? window.__sketchesSettled(f) : true", frames
+            ),
+            timeout / 1000,
+        )
+        return True
+    except Exception:
+        # Timed out, detached or navigated away: print what we have
+        return False
+
+
+async def wait_sketches(page, frames: int = SETTLE_FRAMES, timeout: int = SETTLE_TIMEOUT_MS) -> bool:
+    # Every frame (main document and iframes) settles concurrently
+    done = await asyncio.gather(*(wait_frame(f, frames, timeout) for f in page.frames))
+    return all(done)
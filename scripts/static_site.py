@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# Serve a built Hugo site (public/) to Chromium without `hugo server`.
+#
+# With --site DIR, every request to the BASE origin is answered through
+# Playwright request routing from a table of the files under DIR; each file is
+# read once, on first use, and its bytes are shared by every context of the
+# run until the pool closes. Other
+# origins (CDNs) still go to the network. Build the site with the same base
+# URL the scripts print from, e.g.:
+#
+#   hugo --baseURL http://localhost:1313/p5.quadrille.js/ -d public
+
+import mimetypes
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+
+# ===== CONFIG =====
+INDEX = "index.html"
+NOT_FOUND = "404.html"
+# ===================
+
+mimetypes.add_type("text/javascript", ".mjs")
+mimetypes.add_type("application/wasm", ".wasm")
+
+
+class StaticSite:
+    def __init__(self, root, base: str):
+        self.root = Path(root).resolve()
+        if not self.root.is_dir():
+            raise FileNotFoundError(f"No existe el sitio: {self.root}")
+        url = urlparse(base)
+        self.origin = f"{url.scheme}://{url.netloc}"
+        self.prefix = url.path if url.path.endswith("/") else url.path + "/"
+        self.files = {  # site path ("docs/mutators/index.html") -> file
+            f.relative_to(self.root).as_posix(): f
+            for f in self.root.rglob("*") if f.is_file()
+        }
+        self._bodies = {}
+        self.served = 0
+
+    def _lookup(self, url: str) -> str | None:
+        path = unquote(urlparse(url).path)
+        # Pages of other sections may be built without the base path
+        if path.startswith(self.prefix):
+            path = path[len(self.prefix):]
+        path = path.lstrip("/")
+        for candidate in (path, f"{path.rstrip('/')}/{INDEX}".lstrip("/")):
+            if candidate in self.files:
+                return candidate
+        return None
+
+    def _body(self, name: str) -> bytes:
+        if name not in self._bodies:
+            self._bodies[name] = self.files[name].read_bytes()
+        return self._bodies[name]
+
+    def read(self, url: str) -> bytes:
+        # Same contract as urlopen().read(): bytes or an exception
+        name = self._lookup(url)
+        if name is None:
+            raise FileNotFoundError(url)
+        return self._body(name)
+
+    async def _handle(self, route):
+        name = self._lookup(route.request.url)
+        status = 200
+        if name is None:
+            status, name = 404, (NOT_FOUND if NOT_FOUND in self.files else None)
+        if name is None:
+            await route.fulfill(status=404, body=b"")
+            return
+        ctype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        if ctype.startswith("text/") or ctype in ("application/json", "image/svg+xml"):
+            ctype += "; charset=utf-8"
+        self.served += 1
+        await route.fulfill(status=status, body=self._body(name),
+                            headers={"content-type": ctype, "cache-control": "no-cache"})
+
+    async def install(self, ctx):
+        # BrowserPool hook: route the site origin of every new context
+        await ctx.route(f"{self.origin}/**", self._handle)
+
+    def close(self):
+        self._bodies = {}
+
+
+def add_site_argument(parser):
+    parser.add_argument("--site", metavar="DIR", default=None,
+                        help="serve a built Hugo site (public/) from disk instead of hugo server")
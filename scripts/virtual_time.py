@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# Deterministic virtual-time rendering through the Chrome DevTools Protocol.
+#
+# With --virtual-time MS, page time is paused while the page navigates and,
+# once the document commits, runs under
+# Emulation.setVirtualTimePolicy(pauseIfNetworkFetchesPending, budget=MS):
+# timers, and with them requestAnimationFrame and p5's draw loop, advance as
+# fast as the CPU allows until MS of page time have elapsed (never while a
+# fetch is pending), then time stops and the page is printed. Date.now() starts at a fixed
+# instant and Math.random is seeded, so output is reproducible run to run.
+
+import asyncio
+
+from sketch_ready import THROTTLE_OFF_JS
+
+# ===== CONFIG =====
+VIRTUAL_TIME_MS = 0  # 0 = off (wall-clock readiness waits)
+INITIAL_VIRTUAL_TIME = 1704067200  # 2024-01-01T00:00:00Z, seconds
+RANDOM_SEED = 0x5eed
+FRAME_RATE = 60  # requestAnimationFrame rate under virtual time
+# ===================
+
+# mulberry32: tiny, fast, good enough to make sketches repeatable
+SEED_RANDOM_JS = """
+(() => {
+  let s = %d >>> 0
+  Math.random = () => {
+    s = (s + 0x6D2B79F5) >>> 0
+    let t = s
+    t = Math.imul(t ^ (t >>> 15), t | 1)
+    t ^= t + Math.imul(t ^ (t >>> 7), t | 61)
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296
+  }
+})()
+""" % RANDOM_SEED
+
+# Compositor frames follow the wall clock, so requestAnimationFrame (and with
+# it p5's draw loop) would get one frame or two out of a budget that virtual
+# time burns through in milliseconds. Frames run on virtual-time timers instead
+FRAMES_ON_TIMERS_JS = """
+(() => {
+  window.requestAnimationFrame = cb => setTimeout(() => cb(performance.now()), %d)
+  window.cancelAnimationFrame = id => clearTimeout(id)
+})()
+""" % (1000 // FRAME_RATE)
+
+
+def add_virtual_time_argument(parser):
+    parser.add_argument("--virtual-time", type=int, default=VIRTUAL_TIME_MS, metavar="MS",
+                        help="advance sketches MS of virtual time instead of waiting on the clock")
+
+
+def frames_to_ms(frames: int, fps: int = FRAME_RATE) -> int:
+    return -(-frames * 1000 // fps)
+
+
+async def goto_virtual(ctx, page, url: str, budget_ms: int, timeout: int):
+    # Load `url` and run it for `budget_ms` of virtual time; returns paused
+    await ctx.add_init_script(SEED_RANDOM_JS)
+    await ctx.add_init_script(FRAMES_ON_TIMERS_JS)
+    await ctx.add_init_script(THROTTLE_OFF_JS)  # draw for the whole budget
+    cdp = await ctx.new_cdp_session(page)
+    expired = asyncio.get_running_loop().create_future()
+    cdp.on("Emulation.virtualTimeBudgetExpired",
+           lambda _: expired.done() or expired.set_result(True))
+    # Hold the clock until the document commits: a budget granted on
+    # about:blank, with nothing scheduled, would run out before navigation
+    await cdp.send("Emulation.setVirtualTimePolicy", {
+        "policy": "pause",
+        "initialVirtualTime": INITIAL_VIRTUAL_TIME,
+    })
+    await page.goto(url, wait_until="commit", timeout=timeout)
+    await cdp.send("Emulation.setVirtualTimePolicy", {
+        "policy": "pauseIfNetworkFetchesPending",
+        "budget": budget_ms,
+    })
+    await asyncio.wait_for(expired, timeout / 1000)
+    await page.wait_for_load_state("load", timeout=timeout)
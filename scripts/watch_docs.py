@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# Watch content/docs and re-render only the doc pages a change affects.
+#
+# Keeps one warm browser open against a running `hugo server`, polls the
+# content tree (plus layouts/, static/ and hugo.toml) and maps every changed
+# file to doc URLs: a Markdown file to the page built from it, an asset to
+# the pages of its bundle folder, and site-wide files to every watched page.
+# Those pages alone are rendered and spliced into the section PDF, using its
+# .index.json to keep every other page as it was. The shared asset cache and
+# the static/dynamic classification are dropped before each re-render.
+
+import argparse
+import asyncio
+import time
+from pathlib import Path
+from pikepdf import Pdf
+from playwright.async_api import async_playwright
+
+from browser_pool import BrowserPool
+from build_all_pdfs import SECTIONS
+from manifest import CONTENT_DIR, DOCS, section_paths
+from manifest import section_pages as manifest_pages
+from page_kind import forget as forget_page_kinds
+from section_runner import (
+    LAUNCH_ARGS, SectionMerger, asset_cache, pool_options, read_index, section_pages,
+)
+
+# ===== CONFIG =====
+POLL_INTERVAL_S = 0.5
+HUGO_REBUILD_MS = 400  # let hugo server re-render before we fetch
+SITE_DIR = CONTENT_DIR.parent
+SITE_WIDE = [SITE_DIR / "layouts", SITE_DIR / "static", SITE_DIR / "hugo.toml"]
+# ===================
+
+
+def scan(roots) -> dict:
+    # path -> mtime_ns for every file under `roots`
+    files = {}
+    for root in roots:
+        if root.is_file():
+            files[root] = root.stat().st_mtime_ns
+        elif root.is_dir():
+            for f in root.rglob("*"):
+                if f.is_file() and not f.name.startswith("."):
+                    files[f] = f.stat().st_mtime_ns
+    return files
+
+
+def changed_files(before: dict, after: dict) -> set:
+    return {f for f in before.keys() | after.keys() if before.get(f) != after.get(f)}
+
+
+def affected_pages(files, sections) -> dict:
+    # section -> set of doc paths to re-render (an empty set still re-splices
+    # the section, e.g. to drop a deleted page)
+    manifest_pages.cache_clear()
+    docs = CONTENT_DIR / DOCS
+    out = {}
+    for f in files:
+        try:
+            rel = f.relative_to(docs)
+        except ValueError:
+            for name in sections:  # layouts, static, config: everything
+                out.setdefault(name, set()).update(SECTIONS[name].PATHS)
+            continue
+        name = rel.parts[0]
+        if name not in sections:
+            continue
+        pages = manifest_pages(name)
+        if f.suffix == ".md":
+            hits = [p for p in pages if p.source == f]
+        else:
+            hits = ([p for p in pages if p.source.parent == f.parent]
+                    or [p for p in pages if f.parent in p.source.parents])
+        out.setdefault(name, set()).update(p.path for p in hits)
+    return out
+
+
+def splice(out: Path, order: list, fresh: SectionMerger):
+    # Rewrite `out` in PATHS order from fresh pages, else the previous ones
+    old = Pdf.open(out) if out.exists() else None
+    try:
+        old_index = {e["path"]: e for e in (read_index(out) or [])} if old else {}
+        new_index = {e["path"]: e for e in fresh.index}
+        result = SectionMerger()
+        for path in order:
+            if new_index.get(path, {}).get("count"):
+                e, src = new_index[path], fresh.pdf
+            elif old_index.get(path, {}).get("count"):
+                e, src = old_index[path], old
+            else:
+                result.skip(path)
+                continue
+            result.append(path, src.pages[e["first"]:e["first"] + e["count"]])
+        if result.missing:
+            print(f"⚠️  {out}: {result.missing} página(s) sin PDF previo; ejecuta la sección completa")
+        result.save(out)
+    finally:
+        fresh.close()
+        if old:
+            old.close()
+
+
+async def rerender(pool, name: str, paths: set):
+    mod = SECTIONS[name]
+    if hasattr(mod, "FALLBACK_PATHS"):
+        # Pick up added or removed pages (section_pages reads PATHS at call time)
+        mod.PATHS = section_paths(name, mod.FALLBACK_PATHS)
+    fresh = SectionMerger()
+    if paths:
+        # Edited sketches and images, and pages that gained or lost one,
+        # must not come from what the previous render cached
+        asset_cache().clear()
+        forget_page_kinds()
+        fresh = await section_pages(mod, pool, cache=False, only=paths)
+    await asyncio.to_thread(splice, Path(mod.OUT), mod.PATHS, fresh)
+
+
+async def watch(sections: list[str], interval: float = POLL_INTERVAL_S):
+    sections = [name for name in SECTIONS if name in sections]
+    roots = [CONTENT_DIR / DOCS / name for name in sections] + SITE_WIDE
+    base = SECTIONS[sections[0]].BASE
+    async with async_playwright() as play:
+        async with BrowserPool(play, args=LAUNCH_ARGS, **pool_options(None, base)) as pool:
+            async with pool.page():
+                pass  # launch now so the first change doesn't pay for it
+            state = scan(roots)
+            print(f"👀 Observando {', '.join(sections)} (Ctrl+C para salir)")
+            while True:
+                await asyncio.sleep(interval)
+                changed = changed_files(state, scan(roots))
+                if not changed:
+                    continue
+                start = time.perf_counter()
+                await asyncio.sleep(HUGO_REBUILD_MS / 1000)
+                new_state = scan(roots)  # absorb editors' follow-up writes
+                changed |= changed_files(state, new_state)
+                state = new_state
+                for name, paths in affected_pages(changed, sections).items():
+                    print(f"✏️  {name}: {len(paths)} página(s)")
+                    try:
+                        await rerender(pool, name, paths)
+                    except Exception as e:
+                        print(f"⚠️  Error en {name}: {e}. Sigo observando…")
+                print(f"⏱️  {time.perf_counter() - start:.1f}s")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Re-render doc pages as their sources change")
+    parser.add_argument("--sections", nargs="+", choices=list(SECTIONS), default=list(SECTIONS),
+                        metavar="SECTION", help="sections to watch (default: all)")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL_S,
+                        help=f"seconds between polls (default: {POLL_INTERVAL_S})")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        asyncio.run(watch(args.sections, args.interval))
+    except KeyboardInterrupt:
+        pass